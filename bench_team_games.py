@@ -0,0 +1,73 @@
+"""
+Memory of the current DataFrame-plus-dicts path vs TeamGames arrays.
+
+The schedule is tiled over several seasons (each copy shifted by a year)
+to get multi-season scale.
+
+    python bench_team_games.py --seasons 20
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+import pandas as pd
+
+from precompute import CSV_FILE
+from schedule_data import load_schedule
+from team_games import TeamGames
+
+
+def tile_seasons(df, seasons):
+    copies = []
+    for n in range(seasons):
+        season = df.copy()
+        season["Date"] = season["Date"] + pd.DateOffset(years=n)
+        copies.append(season)
+    return pd.concat(copies, ignore_index=True)
+
+
+def dicts_path(df):
+    # What the Edge app builds: one dict per team-game with a matchup string,
+    # then a DataFrame of them.
+    rows = []
+    for when, home, away in zip(df["Date"], df["Home Team"], df["Away Team"]):
+        rows.append({"Team": home, "Opponent": away, "Date": when, "Home": True, "Matchup": f"vs {away}"})
+        rows.append({"Team": away, "Opponent": home, "Date": when, "Home": False, "Matchup": f"@ {home}"})
+    return rows, pd.DataFrame(rows)
+
+
+def measure(build, *args):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build(*args)
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--seasons", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    df = tile_seasons(load_schedule(args.csv), args.seasons)
+    print(f"{len(df)} games, {2 * len(df)} team-games over {args.seasons} seasons")
+
+    (rows, frame), dict_bytes, dict_time = measure(dicts_path, df)
+    del rows, frame
+    games, array_bytes, array_time = measure(TeamGames.from_schedule, df)
+
+    print(f"{'path':<22}{'retained MB':>12}{'build s':>10}")
+    print(f"{'dicts + DataFrame':<22}{dict_bytes / 2**20:>12.2f}{dict_time:>10.3f}")
+    print(f"{'TeamGames arrays':<22}{array_bytes / 2**20:>12.2f}{array_time:>10.3f}")
+    print(f"array payload {games.nbytes / 2**20:.2f} MB "
+          f"({games.nbytes / len(games):.0f} bytes per team-game), "
+          f"{dict_bytes / max(array_bytes, 1):.0f}x smaller overall")
+
+
+if __name__ == "__main__":
+    main()
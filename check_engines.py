@@ -0,0 +1,295 @@
+"""
+Differential check of the fast engines against the pandas reference helpers.
+
+Generates random schedules, ratings and windows, runs each query through
+the reference (schedule_data's games_per_team_in_range,
+teams_playing_on_date, get_back_to_back_teams and the Edge app's
+team_quality_stats loop) and through the engine that replaces it, and
+fails on the first disagreement. The memory-mapped index app3 serves is
+published and read back for every schedule and checked the same way, and
+the tip-off engines (TipoffIndex, SlateIndex, overlaps) are checked against
+pandas filters on the start times. Also reports how much faster each engine
+answered the same queries.
+
+    python check_engines.py --trials 200 --seed 0
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from matchups import MatchupIndex
+from precompute import build_default_views
+from ratings import TIERS
+from schedule_data import (
+    ScheduleIndex,
+    games_per_team_in_range,
+    get_back_to_back_teams,
+    team_quality_stats,
+    teams_playing_on_date,
+)
+from schedule_diff import diff_schedules
+from shared_index import SharedIndex, publish_index
+from team_games import TeamGames
+from tipoff_index import DEFAULT_SLATES, GAME_MINUTES, SCHEDULE_TZ, TipoffIndex
+
+SEASON_START = pd.Timestamp("2025-10-21")
+START_TIMES = ["12:00p", "1:00p", "3:30p", "7:00p", "7:30p", "8:00p", "9:00p", "10:00p", "10:30p", "11:59p"]
+
+
+class Mismatch(AssertionError):
+    pass
+
+
+# =========================
+# Random inputs
+# =========================
+
+def random_schedule(rng):
+    n_teams = int(rng.integers(2, 31))
+    n_days = int(rng.integers(1, 180))
+    teams = [f"Team {i:02d}" for i in range(n_teams)]
+
+    rows = []
+    for day in range(n_days):
+        if rng.random() < 0.2:
+            continue  # off day
+        shuffled = rng.permutation(n_teams)
+        n_games = int(rng.integers(0, n_teams // 2 + 1))
+        when = SEASON_START + pd.Timedelta(days=day)
+        for g in range(n_games):
+            rows.append((when, teams[shuffled[2 * g]], teams[shuffled[2 * g + 1]]))
+    if not rows:
+        rows.append((SEASON_START, teams[0], teams[1]))
+    return pd.DataFrame(rows, columns=["Date", "Home Team", "Away Team"])
+
+
+def with_start_times(rng, df):
+    """df plus a random Start (ET) per game, like the expanded schedule."""
+    df = df.copy()
+    df["Start (ET)"] = [START_TIMES[i] for i in rng.integers(len(START_TIMES), size=len(df))]
+    return df
+
+
+def random_ratings(rng, teams):
+    ratings = {}
+    for team in teams:
+        if rng.random() < 0.9:  # some teams missing, like a stale sheet
+            ratings[team] = {"Tier": TIERS[rng.integers(len(TIERS))], "Emoji": str(rng.integers(10))}
+    return ratings
+
+
+def random_date(rng, df):
+    span = (df["Date"].max() - df["Date"].min()).days
+    return (df["Date"].min() + pd.Timedelta(days=int(rng.integers(-10, span + 11)))).date()
+
+
+def random_window(rng, df):
+    start = random_date(rng, df)
+    if rng.random() < 0.05:
+        return start, start - timedelta(days=1)  # empty window
+    return start, start + timedelta(days=int(rng.integers(0, 30)))
+
+
+def perturb(rng, df):
+    new = df.copy()
+    for i in rng.choice(len(new), size=min(len(new), int(rng.integers(1, 6))), replace=False):
+        new.loc[i, "Date"] = new.loc[i, "Date"] + pd.Timedelta(days=int(rng.integers(-15, 16)))
+    if len(new) > 1 and rng.random() < 0.5:
+        new = new.drop(index=new.index[int(rng.integers(len(new)))])
+    return new.reset_index(drop=True)
+
+
+# =========================
+# Timing
+# =========================
+
+class Timings:
+    def __init__(self):
+        self.seconds = defaultdict(lambda: {"reference": 0.0, "engine": 0.0, "cases": 0})
+
+    def run(self, check, side, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        self.seconds[check][side] += time.perf_counter() - started
+        if side == "reference":
+            self.seconds[check]["cases"] += 1
+        return result
+
+    def report(self, out=sys.stdout):
+        print(f"{'check':<26}{'cases':>7}{'reference ms':>14}{'engine ms':>11}{'speedup':>9}", file=out)
+        for check, row in self.seconds.items():
+            speedup = row["reference"] / row["engine"] if row["engine"] else float("inf")
+            print(f"{check:<26}{row['cases']:>7}{row['reference'] * 1e3:>14.1f}"
+                  f"{row['engine'] * 1e3:>11.1f}{speedup:>8.1f}x", file=out)
+
+
+def expect(check, case, expected, actual):
+    if expected != actual:
+        raise Mismatch(f"{check} {case}:\n  reference {expected!r}\n  engine    {actual!r}")
+
+
+def expect_ranked(check, case, ranked):
+    games = list(ranked.values())
+    if games != sorted(games, reverse=True):
+        raise Mismatch(f"{check} {case}: not sorted by games: {ranked!r}")
+
+
+# =========================
+# Checks
+# =========================
+
+def check_schedule(rng, df, timings, queries):
+    index = ScheduleIndex(df)
+    games = TeamGames.from_schedule(df, index.teams)
+    matchups = MatchupIndex(games)
+    views = build_default_views(index)
+    ratings = random_ratings(rng, index.teams)
+
+    for _ in range(queries):
+        start, end = random_window(rng, df)
+        case = f"{start}..{end}"
+
+        expected = timings.run("games_per_team_in_range", "reference", games_per_team_in_range, df, start, end)
+        expected = expected.to_dict()
+        ranked = timings.run("games_per_team_in_range", "engine", index.ranked_games, start, end)
+        expect("ScheduleIndex.ranked_games", case, expected, ranked)
+        expect_ranked("ScheduleIndex.ranked_games", case, ranked)
+
+        totals = games.games_per_team(start, end)
+        expect("TeamGames.games_per_team", case, expected,
+               {team: int(n) for team, n in zip(games.teams, totals) if n})
+
+        expected = timings.run("team_quality_stats", "reference", team_quality_stats, df, start, end, ratings)
+        actual = timings.run("team_quality_stats", "engine", matchups.window_stats, start, end, ratings)
+        expect("MatchupIndex.window_stats", case, expected, actual)
+
+        day = random_date(rng, df)
+        when = pd.Timestamp(day)
+        expected = timings.run("teams_playing_on_date", "reference", teams_playing_on_date, df, when)
+        actual = timings.run("teams_playing_on_date", "engine", index.teams_playing_on_date, day)
+        expect("ScheduleIndex.teams_playing_on_date", day, expected, actual)
+
+        expected = timings.run("get_back_to_back_teams", "reference", get_back_to_back_teams, df, day)
+        actual = timings.run("get_back_to_back_teams", "engine", index.get_back_to_back_teams, day)
+        expect("ScheduleIndex.get_back_to_back_teams", day, expected, actual)
+
+        view = views.get(day.isoformat())
+        if view is not None:
+            expect("default views b2b", day, expected, view["b2b"])
+            expect("default views range", day,
+                   games_per_team_in_range(df, day, day + timedelta(days=7)).to_dict(), view["range"])
+
+
+def check_diff(rng, df, timings, queries):
+    new_df = perturb(rng, df)
+    index = ScheduleIndex(df)
+    diff = diff_schedules(df, new_df)
+    timings.run("apply_diff vs rebuild", "reference", ScheduleIndex, new_df)
+    timings.run("apply_diff vs rebuild", "engine", index.apply_diff, diff)
+
+    for _ in range(queries):
+        start, end = random_window(rng, new_df)
+        expect("apply_diff ranked_games", f"{start}..{end}",
+               games_per_team_in_range(new_df, start, end).to_dict(), index.ranked_games(start, end))
+        day = random_date(rng, new_df)
+        expect("apply_diff back_to_back", day, get_back_to_back_teams(new_df, day), index.get_back_to_back_teams(day))
+
+
+def check_shared_index(rng, df, path, queries):
+    index = ScheduleIndex(df)
+    publish_index(index, TeamGames.from_schedule(df, index.teams), path, "check")
+    shared = SharedIndex(path)
+    mapped = shared.schedule_index()
+    matchups = MatchupIndex(shared.team_games())
+    ratings = random_ratings(rng, index.teams)
+
+    for name in ("counts", "cumulative", "back_to_back"):
+        if not np.array_equal(getattr(index, name), getattr(mapped, name)):
+            raise Mismatch(f"SharedIndex {name} differs from the ScheduleIndex it was published from")
+    for _ in range(queries):
+        start, end = random_window(rng, df)
+        case = f"{start}..{end}"
+        expect("SharedIndex ranked_games", case,
+               games_per_team_in_range(df, start, end).to_dict(), mapped.ranked_games(start, end))
+        expect("SharedIndex window_stats", case,
+               team_quality_stats(df, start, end, ratings), matchups.window_stats(start, end, ratings))
+        day = random_date(rng, df)
+        expect("SharedIndex back_to_back", day, get_back_to_back_teams(df, day), mapped.get_back_to_back_teams(day))
+
+
+def check_tipoffs(rng, df, timings, queries):
+    df = with_start_times(rng, df)
+    index = ScheduleIndex(df)
+    tipoffs = TipoffIndex(df)
+    slates = tipoffs.slate_index(SCHEDULE_TZ)
+    names = [name for name, _ in DEFAULT_SLATES]
+
+    et = tipoffs.index(SCHEDULE_TZ)
+    if et.teams != index.teams or et.first_ordinal != index.first_ordinal or not np.array_equal(et.counts, index.counts):
+        raise Mismatch("TipoffIndex.index(SCHEDULE_TZ) differs from the ScheduleIndex built from the CSV")
+
+    # Reference slates: pandas parses the clock, each slate runs to the next one's start.
+    minutes = pd.to_datetime(df["Start (ET)"] + "m", format="%I:%M%p")
+    minutes = minutes.dt.hour * 60 + minutes.dt.minute
+    bounds = pd.to_datetime([start + "m" for _, start in DEFAULT_SLATES], format="%I:%M%p")
+    bounds = list(bounds.hour * 60 + bounds.minute) + [24 * 60]
+    in_slate = {name: (minutes >= bounds[s]) & (minutes < bounds[s + 1]) for s, name in enumerate(names)}
+    in_slate[names[0]] |= minutes < bounds[0]
+
+    for _ in range(queries):
+        start, end = random_window(rng, df)
+        case = f"{start}..{end}"
+        expect("SlateIndex all slates", case, index.ranked_games(start, end), slates.ranked_games(start, end, names))
+
+        chosen = [name for name in names if rng.random() < 0.5]
+        mask = np.zeros(len(df), dtype=bool)
+        for name in chosen:
+            mask |= in_slate[name].to_numpy()
+        expected = timings.run("slate filter", "reference", games_per_team_in_range, df[mask], start, end).to_dict()
+        actual = timings.run("slate filter", "engine", slates.ranked_games, start, end, chosen)
+        expect(f"SlateIndex {chosen}", case, expected, actual)
+
+    # Concurrent games: brute force over every pair of tip-offs.
+    tips = tipoffs.tip_minutes
+    running = ((tips[None, :] <= tips[:, None]) & (tips[None, :] > tips[:, None] - GAME_MINUTES)).sum(axis=1)
+    expect("TipoffIndex.concurrent_games", "all games", running.tolist(), tipoffs.concurrent_games().tolist())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check fast engines against the pandas reference helpers.")
+    parser.add_argument("--trials", type=int, default=100, help="random schedules to generate")
+    parser.add_argument("--queries", type=int, default=10, help="random windows per schedule")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    timings = Timings()
+    scratch = tempfile.mkdtemp(prefix="b2b_check_")
+    shared_path = os.path.join(scratch, "schedule.idx")
+    for trial in range(args.trials):
+        seed = args.seed + trial
+        rng = np.random.default_rng(seed)
+        df = random_schedule(rng)
+        try:
+            check_schedule(rng, df, timings, args.queries)
+            check_diff(rng, df, timings, args.queries)
+            check_shared_index(rng, df, shared_path, args.queries)
+            check_tipoffs(rng, df, timings, args.queries)
+        except Mismatch as e:
+            print(f"MISMATCH (seed {seed}, {len(df)} games): {e}", file=sys.stderr)
+            sys.exit(1)
+
+    shutil.rmtree(scratch, ignore_errors=True)
+    print(f"{args.trials} schedules x {args.queries} queries: all engines agree")
+    timings.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+On-disk result cache shared by every Streamlit worker on the host.
+
+Entries live in one sqlite file (WAL mode, so readers never block each
+other) and are keyed by (version, key): version is the schedule version or
+data source, key is the query. Writes are single transactions, so a reader
+sees either the old value or the new one, never half of it. When the total
+size goes over max_bytes the least recently used entries are dropped
+(access times are coarse: a hit bumps them at most once a minute).
+
+The cache is optional: if the file can't be created, is locked past the
+timeout, or the disk is full or read-only, lookups miss and writes are
+dropped, so get_or_compute() just computes.
+
+    cache = DiskCache()
+    value = cache.get_or_compute(schedule_version, "range:2025-12-29:2026-01-04", compute)
+"""
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+CACHE_FILE = os.environ.get("B2B_CACHE_PATH", "shared_cache.sqlite")
+DEFAULT_MAX_BYTES = 256 * 2**20
+TOUCH_INTERVAL = 60  # seconds between access-time updates for a hot entry
+
+_MISSING = object()
+# Anything that can go wrong opening or writing the file.
+CACHE_ERRORS = (sqlite3.Error, OSError)
+
+log = logging.getLogger(__name__)
+
+
+class DiskCache:
+    def __init__(self, path=CACHE_FILE, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self.available = True
+        try:
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS entries (
+                        version  TEXT NOT NULL,
+                        key      TEXT NOT NULL,
+                        value    BLOB NOT NULL,
+                        size     INTEGER NOT NULL,
+                        created  REAL NOT NULL,
+                        accessed REAL NOT NULL,
+                        PRIMARY KEY (version, key)
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        except CACHE_ERRORS:
+            log.warning("disk cache %s unavailable; computing without it", path, exc_info=True)
+            self.available = False
+
+    def _connect(self):
+        # sqlite connections can't be shared between threads; Streamlit
+        # runs each session on its own thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, version, key, default=None, max_age=None):
+        if not self.available:
+            return default
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created, accessed FROM entries WHERE version = ? AND key = ?",
+                (version, key),
+            ).fetchone()
+        except CACHE_ERRORS:
+            return default
+        now = time.time()
+        if row is None or (max_age is not None and now - row[1] > max_age):
+            return default
+        try:
+            value = pickle.loads(row[0])
+        except Exception:
+            return default
+        # Reads stay read-only: the LRU clock only needs to be roughly right,
+        # so the access time is bumped at most once per TOUCH_INTERVAL.
+        if now - row[2] > TOUCH_INTERVAL:
+            try:
+                with conn:
+                    conn.execute(
+                        "UPDATE entries SET accessed = ? WHERE version = ? AND key = ?",
+                        (now, version, key),
+                    )
+            except CACHE_ERRORS:
+                pass  # a stale access time only affects eviction order
+        return value
+
+    def set(self, version, key, value):
+        if not self.available:
+            return
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    (version, key, blob, len(blob), now, now),
+                )
+                # Keep the most recently used entries that fit in max_bytes.
+                conn.execute("""
+                    DELETE FROM entries WHERE rowid IN (
+                        SELECT rowid FROM (
+                            SELECT rowid, SUM(size) OVER (ORDER BY accessed DESC, rowid DESC) AS running
+                            FROM entries
+                        ) WHERE running > ?
+                    )
+                """, (self.max_bytes,))
+        except CACHE_ERRORS:
+            log.warning("disk cache write of %s/%s failed", version, key, exc_info=True)
+
+    def get_or_compute(self, version, key, compute, max_age=None):
+        value = self.get(version, key, _MISSING, max_age)
+        if value is _MISSING:
+            value = compute()
+            self.set(version, key, value)
+        return value
+
+    def total_bytes(self):
+        return self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
@@ -0,0 +1,62 @@
+"""
+Team-by-day heatmap of who plays when, straight from the ScheduleIndex
+int8 counts matrix.
+
+Long windows are binned into multi-day buckets so the chart never has more
+than 30 x MAX_COLUMNS cells, which keeps a whole-season spec small enough
+for mobile.
+
+Specs are kept in the shared disk cache under the schedule version, keyed
+by heatmap_cache_key(); the popular windows are filled before the first
+request (see warmup.py).
+"""
+import math
+from datetime import timedelta
+
+import altair as alt
+import numpy as np
+
+MAX_COLUMNS = 35
+POPULAR_WINDOWS = (7, 14)   # days from today, warmed ahead of requests
+
+
+def popular_windows(today):
+    return [(today, today + timedelta(days=days)) for days in POPULAR_WINDOWS]
+
+
+def heatmap_cache_key(tz_name, start_date, end_date):
+    return f"heatmap:{tz_name}:{start_date}:{end_date}"
+
+
+def heatmap_data(index, start_date, end_date, max_columns=MAX_COLUMNS):
+    start, end = index.window_bounds(start_date, end_date)
+    n_days = max(end - start + 1, 0)
+
+    bucket = max(math.ceil(n_days / max_columns), 1)
+    n_buckets = math.ceil(n_days / bucket)
+    window = np.zeros((len(index.teams), n_buckets * bucket), dtype=np.int8)
+    window[:, :n_days] = index.counts[:, start:end + 1]
+    binned = window.reshape(len(index.teams), n_buckets, bucket).sum(axis=2, dtype=np.int8)
+
+    labels = [index.date_of(start + b * bucket).strftime("%b %d") for b in range(n_buckets)]
+    values = [
+        {"Team": team, "Day": label, "Games": games}
+        for team, row in zip(index.teams, binned.tolist())
+        for label, games in zip(labels, row)
+    ]
+    return values, bucket
+
+
+def heatmap_spec(index, start_date, end_date, max_columns=MAX_COLUMNS):
+    """Vega-Lite dict for the window (render with st.vega_lite_chart)."""
+    values, bucket = heatmap_data(index, start_date, end_date, max_columns)
+    day_title = "Day" if bucket == 1 else f"{bucket}-day period starting"
+
+    # Inline values rather than a DataFrame: no sanitising pass, smaller spec.
+    chart = alt.Chart(alt.Data(values=values)).mark_rect().encode(
+        x=alt.X("Day:O", sort=None, title=day_title),
+        y=alt.Y("Team:N", title=None),
+        color=alt.Color("Games:Q", scale=alt.Scale(scheme="purples"), title="Games"),
+        tooltip=["Team:N", "Day:O", "Games:Q"],
+    ).properties(width="container")
+    return chart.to_dict()
@@ -0,0 +1,308 @@
+"""
+Offline load test: N simulated sessions driving an app script headlessly.
+
+Each session is a Streamlit AppTest that keeps toggling the back-to-back
+switch and picking new date ranges. Sessions are spread over --processes
+worker processes (default: one per CPU core), like workers behind a load
+balancer; that is the only real concurrency here. Within a process AppTest
+can run one script at a time, so that process's sessions take turns, and
+"wait" in the report is time spent waiting for a turn, not queueing inside
+a Streamlit server. AppTest also reruns the whole script for every widget
+change, so fragment-only reruns aren't measured (profile those with
+?profile=1, see rerun_profile.py). The report gives rerun latency
+percentiles (service time and service + wait), throughput, CPU and RSS.
+
+The Google Sheets connection is replaced by a stub serving the local CSVs,
+so the Edge app runs with no network. If today is outside the season, the
+stub shifts the schedule so today falls inside it. Apps reading the CSV
+directly get date ranges around today clamped into the season instead
+(season_base_day), so off-season runs still measure real windows. Shared
+files (disk cache, schedule.idx, default_views.json, readiness files) go
+to a scratch directory.
+
+    python load_test.py nba_fantasy_app3.py --sessions 20 --actions 30
+    python load_test.py nba_fantasy_app-need_spacing_fix.py --sessions 10 --json > run.json
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from precompute import CSV_FILE
+from ratings import TIER_EMOJIS, TIERS
+
+MAX_RANGE_DAYS = 30 + 14    # furthest end date random_action picks past its base day
+
+
+# =========================
+# Sheets stub
+# =========================
+
+def stub_schedule(csv_path):
+    df = pd.read_csv(csv_path)
+    dates = pd.to_datetime(df["Date"], format="%d/%m/%Y")
+    today = pd.Timestamp(date.today())
+    if not dates.min() <= today <= dates.max():
+        dates = dates + (today - pd.Timedelta(days=30) - dates.min())
+    df["Date"] = dates.dt.strftime("%d/%m/%Y")
+    return df
+
+
+def stub_ratings(teams, seed=0):
+    rng = random.Random(seed)
+    tiers = [rng.choice(TIERS) for _ in teams]
+    return pd.DataFrame({"Team": teams, "Tier": tiers, "Emoji": [TIER_EMOJIS[t] for t in tiers]})
+
+
+def season_base_day(script, csv_path=CSV_FILE, today=None):
+    """
+    Day the sessions pick their date ranges around. Apps reading the Sheets
+    stub see a schedule shifted to contain today; apps reading the CSV see
+    the real season, so today is clamped into it (leaving room for the
+    ranges random_action picks), and an off-season run still hits games.
+    """
+    today = today or date.today()
+    with open(script) as f:
+        if "from sheets import" in f.read():
+            return today
+    dates = pd.to_datetime(pd.read_csv(csv_path)["Date"], format="%d/%m/%Y")
+    first = dates.min().date() + timedelta(days=1)
+    last = max(dates.max().date() - timedelta(days=MAX_RANGE_DAYS), first)
+    return min(max(today, first), last)
+
+
+def isolate_shared_files():
+    # Keep stub data out of the real on-disk cache and readiness file.
+    scratch = tempfile.mkdtemp(prefix="b2b_load_test_")
+    os.environ["B2B_CACHE_PATH"] = os.path.join(scratch, "shared_cache.sqlite")
+    os.environ["B2B_READY_FILE"] = os.path.join(scratch, "warmup_ready")
+    os.environ["B2B_SHARED_INDEX"] = os.path.join(scratch, "schedule.idx")
+    os.environ["B2B_VIEWS_PATH"] = os.path.join(scratch, "default_views.json")
+
+
+def install_gsheets_stub(csv_path=CSV_FILE):
+    from streamlit.connections import BaseConnection
+
+    schedule = stub_schedule(csv_path)
+    ratings = stub_ratings(sorted(set(schedule["Home Team"]).union(schedule["Away Team"])))
+
+    class GSheetsConnection(BaseConnection):
+        def _connect(self, **kwargs):
+            return None
+
+        def read(self, spreadsheet=None, **kwargs):
+            # The ratings tab is picked out by its gid; anything else is the schedule.
+            if spreadsheet and "gid=1403257463" in spreadsheet:
+                return ratings.copy()
+            return schedule.copy()
+
+    module = types.ModuleType("streamlit_gsheets")
+    module.GSheetsConnection = GSheetsConnection
+    sys.modules["streamlit_gsheets"] = module
+
+
+# =========================
+# Sessions
+# =========================
+
+def find(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    return None
+
+
+def random_action(at, rng, base_day):
+    """Change one widget the way a user would; return the action name."""
+    start = base_day + timedelta(days=rng.randint(-1, 30))
+    end = start + timedelta(days=rng.randint(0, 14))
+
+    b2b = find(at.checkbox, "Show teams playing today & tomorrow (back-to-back)") \
+        or find(at.toggle, "Show Back-to-Backs Only")
+    date_range = find(at.date_input, "Select Date Range")
+    start_input = find(at.date_input, "Start Date")
+    end_input = find(at.date_input, "End Date")
+    button = find(at.button, "Show games")
+
+    roll = rng.random()
+    if b2b is not None and (roll < 0.3 or (date_range is None and start_input is None)):
+        b2b.set_value(not b2b.value)
+        return "toggle b2b"
+    if date_range is not None:
+        date_range.set_value((start, end))
+        return "date range"
+    if start_input is not None and end_input is not None:
+        if roll < 0.6:
+            start_input.set_value(start)
+            end_input.set_value(end)
+            return "date range"
+        if button is not None:
+            button.click()
+            return "show games"
+    if b2b is not None:
+        b2b.set_value(not b2b.value)
+        return "toggle b2b"
+    return "rerun"
+
+
+# AppTest swaps a global Runtime in and out around every run, so runs in one
+# process can't overlap. The wait for this lock is an artefact of the
+# harness; it's reported separately from the service time.
+RUN_LOCK = threading.Lock()
+
+
+def timed_run(at, action, samples):
+    queued = time.perf_counter()
+    with RUN_LOCK:
+        started = time.perf_counter()
+        at.run()
+        finished = time.perf_counter()
+    samples.append((action, finished - queued, finished - started, len(at.exception)))
+
+
+def run_session(script, actions, seed, timeout, start_gate, base_day):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    samples = []
+    start_gate.wait()
+
+    at = AppTest.from_file(script, default_timeout=timeout)
+    timed_run(at, "first load", samples)
+    for _ in range(actions):
+        timed_run(at, random_action(at, rng, base_day), samples)
+    return samples
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * resource.getpagesize() / 2**20
+
+
+def run_worker(script, seeds, actions, timeout, base_day):
+    """One server process: its sessions run as threads."""
+    install_gsheets_stub()
+    gate = threading.Event()
+    rss_start = rss_mb()
+    cpu_start = time.process_time()
+
+    with ThreadPoolExecutor(max_workers=len(seeds)) as pool:
+        futures = [pool.submit(run_session, script, actions, seed, timeout, gate, base_day) for seed in seeds]
+        gate.set()
+        samples = [sample for future in futures for sample in future.result()]
+
+    return {
+        "samples": samples,
+        "cpu_s": time.process_time() - cpu_start,
+        "rss_start_mb": rss_start,
+        "rss_end_mb": rss_mb(),
+        "rss_peak_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def summarize(latencies):
+    ms = np.array(latencies) * 1e3
+    return {
+        "count": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def run_load_test(script, sessions, actions, processes=1, seed=0, timeout=60):
+    seeds = [list(range(seed + p, seed + sessions, processes)) for p in range(processes)]
+    seeds = [chunk for chunk in seeds if chunk]
+    isolate_shared_files()
+    base_day = season_base_day(script)
+
+    wall_started = time.perf_counter()
+    if len(seeds) == 1:
+        workers = [run_worker(script, seeds[0], actions, timeout, base_day)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(seeds)) as pool:
+            workers = list(pool.map(run_worker, repeat(script), seeds, repeat(actions), repeat(timeout), repeat(base_day)))
+    wall = time.perf_counter() - wall_started
+
+    samples = [sample for worker in workers for sample in worker["samples"]]
+    cpu = sum(worker["cpu_s"] for worker in workers)
+    by_action = {}
+    for action, latency, _, _ in samples:
+        by_action.setdefault(action, []).append(latency)
+
+    return {
+        "script": script,
+        "sessions": sessions,
+        "processes": len(workers),
+        "max_sessions_per_process": max(len(chunk) for chunk in seeds),
+        "actions_per_session": actions,
+        "base_day": base_day.isoformat(),
+        "wall_s": wall,
+        "reruns_per_s": len(samples) / wall,
+        "cpu_s": cpu,
+        "cpu_cores_used": cpu / wall,
+        "rss_start_mb": sum(worker["rss_start_mb"] for worker in workers),
+        "rss_end_mb": sum(worker["rss_end_mb"] for worker in workers),
+        "rss_peak_mb": sum(worker["rss_peak_mb"] for worker in workers),
+        "errors": sum(errors for _, _, _, errors in samples),
+        "service": summarize([service for _, _, service, _ in samples]),
+        "all": summarize([latency for _, latency, _, _ in samples]),
+        "by_action": {action: summarize(values) for action, values in sorted(by_action.items())},
+    }
+
+
+def print_report(report, out=sys.stdout):
+    print(f"{report['script']}: {report['sessions']} sessions x {report['actions_per_session']} actions "
+          f"on {report['processes']} process(es), date ranges around {report['base_day']}", file=out)
+    print(f"  wall {report['wall_s']:.1f}s, {report['reruns_per_s']:.1f} reruns/s, "
+          f"CPU {report['cpu_s']:.1f}s ({report['cpu_cores_used']:.2f} cores), "
+          f"RSS {report['rss_start_mb']:.0f} -> {report['rss_end_mb']:.0f} MB "
+          f"(peak {report['rss_peak_mb']:.0f} MB), {report['errors']} script errors", file=out)
+    if report["max_sessions_per_process"] > 1:
+        print(f"  note: up to {report['max_sessions_per_process']} sessions per process take turns (one AppTest "
+              f"run at a time), so 'all' includes waiting for a turn; use more --processes for real concurrency", file=out)
+    print("  note: every rerun is a full script run; fragment-only reruns are not measured", file=out)
+    print(f"  {'action':<14}{'n':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}", file=out)
+    rows = [("service", report["service"]), ("all", report["all"]), *report["by_action"].items()]
+    for action, row in rows:
+        print(f"  {action:<14}{row['count']:>6}{row['p50_ms']:>10.1f}{row['p90_ms']:>10.1f}"
+              f"{row['p99_ms']:>10.1f}{row['max_ms']:>10.1f}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate concurrent sessions against an app script.")
+    parser.add_argument("script", nargs="?", default="nba_fantasy_app3.py")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--actions", type=int, default=20, help="widget changes per session")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1,
+                        help="server processes to spread sessions over (like workers behind a load balancer); "
+                             "sessions in one process run one at a time")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60, help="seconds allowed per rerun")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args.script, args.sessions, args.actions, args.processes, args.seed, args.timeout)
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Opponent index: every team's games in CSR form, sorted by (team, day).
+
+    indptr[t]:indptr[t+1]   team t's games
+    opponent, day, home     parallel arrays over those games
+
+"Who does X face between A and B" is a binary search inside X's segment
+plus a slice, "how often do X and Y meet" is a lookup in a team x team
+matrix, and window_stats gives every team's matchups for a window (the
+Edge app's Games / Quality Score / Matchups table) without iterating rows.
+"""
+from datetime import date
+
+import numpy as np
+
+from schedule_data import DEFAULT_RATING, TIER_SCORES
+from team_games import TeamGames
+
+
+class MatchupIndex:
+    def __init__(self, games):
+        self.teams = games.teams
+        self.team_pos = {team: i for i, team in enumerate(self.teams)}
+        self.first_ordinal = games.first_ordinal
+        n_teams = len(self.teams)
+
+        order = np.lexsort((games.day, games.team))
+        self.opponent = games.opponent[order]
+        self.day = games.day[order]
+        self.home = games.home[order]
+        self.indptr = np.zeros(n_teams + 1, dtype=np.int64)
+        np.cumsum(np.bincount(games.team, minlength=n_teams), out=self.indptr[1:])
+
+        # (team, day) packed into one sorted key so all teams' window bounds
+        # come from a single searchsorted.
+        self._stride = int(self.day.max()) + 2 if len(self.day) else 1
+        self._key = np.repeat(np.arange(n_teams, dtype=np.int64), np.diff(self.indptr)) * self._stride + self.day
+
+        self.meetings_matrix = np.zeros((n_teams, n_teams), dtype=np.int16)
+        np.add.at(self.meetings_matrix, (games.team, games.opponent), 1)
+
+    @classmethod
+    def from_schedule(cls, df):
+        return cls(TeamGames.from_schedule(df))
+
+    def _clip_day(self, value):
+        day = value.toordinal() - self.first_ordinal
+        return min(max(day, -1), self._stride - 1)
+
+    def _bounds(self, teams, start_date, end_date):
+        start = self._clip_day(start_date)
+        end = self._clip_day(end_date)
+        base = np.asarray(teams, dtype=np.int64) * self._stride
+        lo = np.searchsorted(self._key, base + start, side="left")
+        hi = np.searchsorted(self._key, base + end, side="right")
+        return lo, np.maximum(hi, lo)
+
+    def opponents(self, team, start_date, end_date):
+        """[(date, opponent, home)] for team's games in the window."""
+        lo, hi = self._bounds([self.team_pos[team]], start_date, end_date)
+        return [
+            (date.fromordinal(self.first_ordinal + d), self.teams[o], bool(h))
+            for d, o, h in zip(
+                self.day[lo[0]:hi[0]].tolist(),
+                self.opponent[lo[0]:hi[0]].tolist(),
+                self.home[lo[0]:hi[0]].tolist(),
+            )
+        ]
+
+    def meetings(self, team, other, start_date=None, end_date=None):
+        t, o = self.team_pos[team], self.team_pos[other]
+        if start_date is None and end_date is None:
+            return int(self.meetings_matrix[t, o])
+        lo, hi = self._bounds(
+            [t],
+            start_date or date.fromordinal(self.first_ordinal),
+            end_date or date.fromordinal(self.first_ordinal + self._stride),
+        )
+        return int(np.count_nonzero(self.opponent[lo[0]:hi[0]] == o))
+
+    def window_stats(self, start_date, end_date, rating_map=None):
+        """
+        The Edge app's team_stats rows for a window: Team, Games, Score
+        (+1 per Pushover opponent, -1 per Lockdown) and the Matchups string.
+        Teams without games in the window are left out.
+        """
+        rating_map = rating_map or {}
+        infos = [rating_map.get(team, DEFAULT_RATING) for team in self.teams]
+        weights = np.array([TIER_SCORES.get(info['Tier'], 0) for info in infos], dtype=np.int16)
+        labels = np.array([f"{info['Emoji']} vs {team}" for team, info in zip(self.teams, infos)], dtype=object)
+
+        lo, hi = self._bounds(np.arange(len(self.teams)), start_date, end_date)
+        counts = hi - lo
+        # Scores for all teams at once: running sum over opponent weights,
+        # differenced at each team's window bounds.
+        running = np.concatenate([[0], np.cumsum(weights[self.opponent], dtype=np.int64)])
+        scores = running[hi] - running[lo]
+        opponent_labels = labels[self.opponent]
+
+        return [
+            {
+                "Team": self.teams[t],
+                "Games": int(counts[t]),
+                "Score": int(scores[t]),
+                "Matchups": " | ".join(opponent_labels[lo[t]:hi[t]]),
+            }
+            for t in np.flatnonzero(counts)
+        ]
@@ -1,135 +1,180 @@
 import streamlit as st
 import pandas as pd
-from streamlit_gsheets import GSheetsConnection
-from datetime import date, timedelta
-
-# Page Config
-st.set_page_config(page_title="NBA Streamer's Edge", layout="centered")
-
-# --- 1. ROBUST CSS (Works on Mobile & Desktop) ---
-st.markdown("""
-    <style>
-    /* Force the main area to be a light grey so white cards pop */
-    [data-testid="stAppViewContainer"] {
-        background-color: #F0F2F6 !important;
-    }
-    
-    /* Target the container that Streamlit uses for 'border=True' */
-    /* This selector is more robust for mobile browsers */
-    div[data-testid="stVerticalBlockBorderWrapper"] {
-        background-color: white !important;
-        border-radius: 15px !important;
-        border: 1px solid #DDE1E7 !important;
-        padding: 20px !important;
-        margin-bottom: 20px !important;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.05) !important;
-    }
-
-    /* Keep text black and readable */
-    h1, h2, h3, p, span, label {
-        color: #1E1E1E !important;
-    }
-
-    /* Style the expanders inside the cards */
-    .streamlit-expanderHeader {
-        background-color: #FFFFFF !important;
-        border: 1px solid #F0F2F6 !important;
-        border-radius: 8px !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
-# --- 2. LOGO ---
-try:
-    st.image("NBA-B2B-Track_logo.png", width='stretch')
-except:
-    st.title("🏀 NBA Streamer's Edge")
+import os
+from datetime import timedelta
+
+from disk_cache import DiskCache
+from matchups import MatchupIndex
+from precompute import file_version
+from ratings import DefenseRatings
+from rerun_profile import profiled_rerun, show_profile_summary
+from schedule_data import load_expanded_schedule
+from sheets import SHEETS_MAX_AGE, cached_ratings, cached_schedule
+from tipoff_index import EXPANDED_CSV_FILE, local_today, valid_zone
+from warmup import Warmup, ready_path
+
+def page_header():
+    # Page Config
+    st.set_page_config(page_title="NBA Streamer's Edge", layout="centered")
+
+    # --- 1. ROBUST CSS (Works on Mobile & Desktop) ---
+    st.markdown("""
+        <style>
+        /* Force the main area to be a light grey so white cards pop */
+        [data-testid="stAppViewContainer"] {
+            background-color: #F0F2F6 !important;
+        }
+
+        /* Target the container that Streamlit uses for 'border=True' */
+        /* This selector is more robust for mobile browsers */
+        div[data-testid="stVerticalBlockBorderWrapper"] {
+            background-color: white !important;
+            border-radius: 15px !important;
+            border: 1px solid #DDE1E7 !important;
+            padding: 20px !important;
+            margin-bottom: 20px !important;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.05) !important;
+        }
+
+        /* Keep text black and readable */
+        h1, h2, h3, p, span, label {
+            color: #1E1E1E !important;
+        }
+
+        /* Style the expanders inside the cards */
+        .streamlit-expanderHeader {
+            background-color: #FFFFFF !important;
+            border: 1px solid #F0F2F6 !important;
+            border-radius: 8px !important;
+        }
+        </style>
+        """, unsafe_allow_html=True)
+
+    # --- 2. LOGO ---
+    try:
+        st.image("NBA-B2B-Track_logo.png", width='stretch')
+    except:
+        st.title("🏀 NBA Streamer's Edge")
 
 # --- 3. DATA LOADING ---
-conn = st.connection("gsheets", type=GSheetsConnection)
+# The browser's zone, so "today" flips at the user's midnight rather than
+# the server's.
+def user_timezone():
+    return valid_zone(getattr(st.context, "timezone", None))
+
+# Shared by every worker process on this host, so scaling out doesn't
+# multiply the Sheets fetches.
+@st.cache_resource
+def open_shared_cache():
+    return DiskCache()
 
-@st.cache_data(ttl=3600)
+# Half of the Sheets freshness budget here, half in the shared copy.
+@st.cache_data(ttl=SHEETS_MAX_AGE // 2)
 def load_data():
-    schedule_url = "https://docs.google.com/spreadsheets/d/19WTtvYIW132Tzv94ktKNrkug_z975AfiLrbUcJq04uQ/edit?gid=1678584316#gid=1678584316"
-    ratings_url = "https://docs.google.com/spreadsheets/d/19WTtvYIW132Tzv94ktKNrkug_z975AfiLrbUcJq04uQ/edit?gid=1403257463#gid=1403257463"
-    schedule = conn.read(spreadsheet=schedule_url)
-    ratings = conn.read(spreadsheet=ratings_url)
-    schedule.columns = schedule.columns.str.strip().str.title()
-    ratings.columns = ratings.columns.str.strip().str.title()
-    schedule['Date'] = pd.to_datetime(schedule['Date'], dayfirst=True)
-    return schedule, ratings
-
-try:
-    df_schedule, df_ratings = load_data()
-    
-    # --- 4. TOP-LEVEL FILTERS (BETTER FOR MOBILE) ---
-    # We move these out of the sidebar so they are the first thing mobile users see
-    with st.container(border=True):
-        st.subheader("🗓️ Filter Games")
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            b2b_toggle = st.toggle("Show Back-to-Backs Only", value=False)
-        
-        today_val = date.today()
-        yesterday = today_val - timedelta(days=1)
-        max_date = df_schedule['Date'].max().date()
-
-        if not b2b_toggle:
-            with col2:
-                # Combining range into a single input to save space on mobile
-                date_range = st.date_input(
-                    "Select Date Range",
-                    value=(today_val, today_val + timedelta(days=7)),
-                    min_value=yesterday,
-                    max_value=max_date
-                )
-                if len(date_range) == 2:
-                    start_date, end_date = date_range
-                else:
-                    start_date = end_date = date_range[0]
+    return cached_schedule(open_shared_cache())
+
+# Tiers are computed from the local box scores; the engine lives for the
+# process and only replays games added since the file last changed.
+@st.cache_resource
+def defense_ratings():
+    return DefenseRatings.from_csv(EXPANDED_CSV_FILE)
+
+@st.cache_data
+def load_local_ratings(version):
+    ratings = defense_ratings()
+    ratings.update(load_expanded_schedule(EXPANDED_CSV_FILE))
+    return ratings.tier_table()
+
+def load_ratings():
+    try:
+        return load_local_ratings(file_version(EXPANDED_CSV_FILE))
+    except FileNotFoundError:
+        # No box scores on this host: fall back to the hand-kept sheet.
+        return cached_ratings(open_shared_cache())
+
+# Opponent index over the whole schedule, rebuilt only when the data changes.
+@st.cache_resource
+def build_matchup_index(schedule):
+    return MatchupIndex.from_schedule(schedule)
+
+# `python warmup.py --run edge` fills the shared Sheets copy before the
+# server starts; this keeps the hourly cache fresh afterwards, so no user
+# request waits on Sheets.
+@st.cache_resource
+def start_warmup():
+    return Warmup(
+        [("sheets", load_data), ("ratings", load_ratings)],
+        ready_file=ready_path("edge", os.getpid()),
+    ).start()
+
+def main():
+    page_header()
+    start_warmup()
+
+    try:
+        df_schedule = load_data()
+        df_ratings = load_ratings()
+
+        # --- 4. TOP-LEVEL FILTERS (BETTER FOR MOBILE) ---
+        # We move these out of the sidebar so they are the first thing mobile users see
+        with st.container(border=True):
+            st.subheader("🗓️ Filter Games")
+            col1, col2 = st.columns(2)
+
+            with col1:
+                b2b_toggle = st.toggle("Show Back-to-Backs Only", value=False)
+
+            today_val = local_today(user_timezone())
+            yesterday = today_val - timedelta(days=1)
+            max_date = df_schedule['Date'].max().date()
+
+            if not b2b_toggle:
+                with col2:
+                    # Combining range into a single input to save space on mobile
+                    date_range = st.date_input(
+                        "Select Date Range",
+                        value=(today_val, today_val + timedelta(days=7)),
+                        min_value=yesterday,
+                        max_value=max_date
+                    )
+                    if len(date_range) == 2:
+                        start_date, end_date = date_range
+                    else:
+                        start_date = end_date = date_range[0]
+            else:
+                start_date, end_date = today_val, today_val + timedelta(days=1)
+                st.info(f"Showing games for {start_date} and {end_date}")
+
+        # --- 5. PROCESSING ---
+        rating_map = df_ratings.set_index('Team')[['Tier', 'Emoji']].to_dict('index')
+        team_stats = build_matchup_index(df_schedule).window_stats(start_date, end_date, rating_map)
+        if b2b_toggle:
+            team_stats = [row for row in team_stats if row['Games'] >= 2]
+
+        # --- 6. DISPLAY ---
+        if team_stats:
+            df_res = pd.DataFrame(team_stats)
+            for count in sorted(df_res['Games'].unique(), reverse=True):
+                with st.container(border=True):
+                    st.header(f"📅 Teams playing {count} games")
+                    subset = df_res[df_res['Games'] == count].sort_values("Score", ascending=False)
+                    for _, row in subset.iterrows():
+                        vibe = "🔥" if row['Score'] > 0 else "❄️" if row['Score'] < 0 else "⚪"
+                        with st.expander(f"{vibe} {row['Team']} (Quality Score: {row['Score']})"):
+                            st.write(f"**Matchups:** {row['Matchups']}")
         else:
-            start_date, end_date = today_val, today_val + timedelta(days=1)
-            st.info(f"Showing games for {start_date} and {end_date}")
-
-    # --- 5. PROCESSING ---
-    mask = (df_schedule['Date'].dt.date >= start_date) & (df_schedule['Date'].dt.date <= end_date)
-    filtered = df_schedule[mask]
-    rating_map = df_ratings.set_index('Team')[['Tier', 'Emoji']].to_dict('index')
-    all_teams = sorted(pd.concat([df_schedule['Home Team'], df_schedule['Away Team']]).unique())
-    
-    team_stats = []
-    for team in all_teams:
-        games = filtered[(filtered['Home Team'] == team) | (filtered['Away Team'] == team)].sort_values('Date')
-        if b2b_toggle and len(games) < 2: continue
-        if not games.empty:
-            score = 0
-            matchups = []
-            for _, row in games.iterrows():
-                opp = row['Away Team'] if row['Home Team'] == team else row['Home Team']
-                info = rating_map.get(opp, {'Tier': 'Neutral', 'Emoji': '⚪'})
-                if info['Tier'] == 'Pushover': score += 1
-                elif info['Tier'] == 'Lockdown': score -= 1
-                matchups.append(f"{info['Emoji']} vs {opp}")
-            team_stats.append({"Team": team, "Games": len(games), "Score": score, "Matchups": " | ".join(matchups)})
-
-    # --- 6. DISPLAY ---
-    if team_stats:
-        df_res = pd.DataFrame(team_stats)
-        for count in sorted(df_res['Games'].unique(), reverse=True):
-            with st.container(border=True):
-                st.header(f"📅 Teams playing {count} games")
-                subset = df_res[df_res['Games'] == count].sort_values("Score", ascending=False)
-                for _, row in subset.iterrows():
-                    vibe = "🔥" if row['Score'] > 0 else "❄️" if row['Score'] < 0 else "⚪"
-                    with st.expander(f"{vibe} {row['Team']} (Quality Score: {row['Score']})"):
-                        st.write(f"**Matchups:** {row['Matchups']}")
-    else:
-        st.warning("No teams found for this selection.")
-
-    # Methodology at the very bottom for mobile accessibility
-    with st.expander("ℹ️ How Quality Scores work"):
-        st.write("Score is based on opponent defensive ratings from the last 15 games (+1 for Pushover, -1 for Lockdown).")
-
-except Exception as e:
-    st.error(f"Error: {e}")
\ No newline at end of file
+            st.warning("No teams found for this selection.")
+
+        # Methodology at the very bottom for mobile accessibility
+        with st.expander("ℹ️ How Quality Scores work"):
+            st.write("Score is based on opponent defensive ratings from the last 15 games (+1 for Pushover, -1 for Lockdown). "
+                     "The third of teams allowing the most points are Pushovers, the third allowing the fewest are Lockdowns.")
+
+    except Exception as e:
+        st.error(f"Error: {e}")
+
+# B2B_PROFILE_RATE (or ?profile=1, where allowed) captures this rerun,
+# page setup and data loading included; see rerun_profile.py.
+with profiled_rerun("streamers_edge") as rerun_capture:
+    main()
+show_profile_summary(rerun_capture)
@@ -1,66 +1,30 @@
-import pandas as pd
 import streamlit as st
-from datetime import date, timedelta
-from PIL import Image
+from datetime import datetime, timedelta
 
+import os
+import time
+from zoneinfo import ZoneInfo
 
-
-# =========================
-# Data helpers (NO Streamlit here)
-# =========================
-
-def load_schedule(csv_path):
-    df = pd.read_csv(csv_path)
-    df["Date"] = pd.to_datetime(df["Date"], format="%d/%m/%Y")
-    return df
-
-
-def games_per_team_in_range(df, start_date, end_date):
-    start_date = pd.to_datetime(start_date)
-    end_date = pd.to_datetime(end_date)
-
-    df = df[(df["Date"] >= start_date) & (df["Date"] <= end_date)]
-
-    home = df["Home Team"].value_counts()
-    away = df["Away Team"].value_counts()
-
-    return home.add(away, fill_value=0).astype(int).sort_values(ascending=False)
+from schedule_data import ScheduleIndex, load_schedule, load_expanded_schedule, group_teams_by_games
+from precompute import CSV_FILE, VIEWS_FILE, file_version, refresh_default_views, lookup_default_view
+from heatmap import heatmap_cache_key, heatmap_spec, popular_windows
+from disk_cache import DiskCache
+from warmup import Warmup, ready_path
+from tipoff_index import DEFAULT_SLATES, EXPANDED_CSV_FILE, GAME_MINUTES, SCHEDULE_TZ, TipoffIndex, valid_zone
+from shared_index import SHARED_INDEX_FILE, SharedIndexReader, publish_from_csv
+from watchlist import WATCHLIST_FILE, AlertRunner
+from rerun_profile import profiled, profiled_rerun, show_profile_summary
+from projections import ProjectionIndex
 
 
-def teams_playing_on_date(df, target_date):
-    return set(
-        df[df["Date"] == target_date]["Home Team"]
-    ).union(
-        set(df[df["Date"] == target_date]["Away Team"])
-    )
-
-
-def get_back_to_back_teams(df, base_date):
-    today = pd.to_datetime(base_date)
-    tomorrow = today + pd.Timedelta(days=1)
-
-    teams_today = teams_playing_on_date(df, today)
-    teams_tomorrow = teams_playing_on_date(df, tomorrow)
-
-    return sorted(teams_today & teams_tomorrow)
-
-
-def group_teams_by_games(games_series):
-    grouped = {}
-    for team, games in games_series.items():
-        grouped.setdefault(games, []).append(team)
-    return grouped
-
 
 # =========================
 # Streamlit UI
 # =========================
 import base64
-import pandas as pd
-import streamlit as st
-from datetime import date
 
-# 1. Helper to encode image
+# 1. Helper to encode image (cached, so reruns skip the base64 encoding)
+@st.cache_resource
 def get_base64_of_bin_file(bin_file):
     with open(bin_file, 'rb') as f:
         data = f.read()
@@ -103,64 +67,267 @@ def apply_custom_styles(bin_file):
     </style>
     '''
     st.markdown(css, unsafe_allow_html=True)
-# Apply styles
-apply_custom_styles('background_court.jpg')
 
-# 3. Use the "Glass" Container for your UI
-# Wrap your main title in a div with the glass-container class
-st.markdown('<div class="glass-container">', unsafe_allow_html=True)
+def page_header():
+    # Apply styles
+    apply_custom_styles('background_court.jpg')
+
+    # 3. Use the "Glass" Container for your UI
+    # Wrap your main title in a div with the glass-container class
+    st.markdown('<div class="glass-container">', unsafe_allow_html=True)
+
+    st.markdown("## 🏀 NBA Game Tracker", unsafe_allow_html=True)
+    st.write("Select your date range to see which teams are busiest.")
+
+    # ... (Place your interactive widgets like date_input or checkboxes here) ...
+
+    st.markdown('</div>', unsafe_allow_html=True) # End of top glass box
+
+
+
+
+
+# =========================
+# Shared data layer (cached across reruns and sessions)
+# =========================
+
+# One per process: opening it runs PRAGMAs and a CREATE TABLE, which
+# shouldn't happen on every rerun.
+@st.cache_resource
+def open_shared_cache():
+    return DiskCache()
+
+
+@st.cache_resource
+def shared_index_reader():
+    return SharedIndexReader(SHARED_INDEX_FILE)
+
+
+def current_shared_index(csv_path, version):
+    """
+    The published index for this CSV version, publishing it first if it's
+    missing or stale. A failed publish (read-only deploy, full disk) leaves
+    whatever was there; load_index then builds a private index.
+    """
+    reader = shared_index_reader()
+    shared = reader.get()
+    if shared is None or shared.version != version:
+        try:
+            publish_from_csv(csv_path, SHARED_INDEX_FILE, version)
+        except OSError:
+            return shared
+        shared = reader.get(refresh=True)
+    return shared
+
 
-st.markdown("## 🏀 NBA Game Tracker", unsafe_allow_html=True)
-st.write("Select your date range to see which teams are busiest.")
+@st.cache_resource
+def load_index(csv_path, version):
+    # Map the published index, so every worker process shares one copy.
+    # A private one is built only if it can't be published here, or if
+    # another process has already republished it for a newer CSV.
+    shared = current_shared_index(csv_path, version)
+    if shared is not None and shared.version == version:
+        return shared.schedule_index()
+    return ScheduleIndex(load_schedule(csv_path))
 
-# ... (Place your interactive widgets like date_input or checkboxes here) ...
 
-st.markdown('</div>', unsafe_allow_html=True) # End of top glass box
+@st.cache_resource
+def load_default_views(csv_path, views_path, version):
+    return refresh_default_views(csv_path, views_path)
 
 
+@st.cache_resource
+def load_tipoff_index(csv_path, version):
+    return TipoffIndex.from_csv(csv_path).precompute()
 
 
-CSV_FILE = "schedule_comma_separated.csv"
-df = load_schedule(CSV_FILE)
+# Projected points live on the tip-off index's calendar for the zone, so
+# they bucket into the same local days as the game counts.
+@st.cache_resource
+def load_projection_index(csv_path, version, tz_name):
+    index, days = load_tipoff_index(csv_path, version).for_zone(tz_name)
+    return ProjectionIndex(index, load_expanded_schedule(csv_path), days)
 
-# ---- Back-to-back toggle ----
-show_back_to_back = st.checkbox(
-    "Show teams playing today & tomorrow (back-to-back)",
-    value=False
-)
 
-st.divider()
+def user_timezone():
+    # The browser's zone, so "today" flips at the user's midnight rather
+    # than the server's. Schedule dates are ET days.
+    return valid_zone(getattr(st.context, "timezone", None))
+
+
+def tipoff_index():
+    return load_tipoff_index(EXPANDED_CSV_FILE, expanded_version)
+
+
+def source_for(tz_name):
+    """(csv_path, version) that tz_name's schedule index is built from."""
+    if tz_name == SCHEDULE_TZ:
+        return CSV_FILE, schedule_version
+    return EXPANDED_CSV_FILE, expanded_version
+
+
+def index_for(tz_name):
+    if tz_name == SCHEDULE_TZ:
+        return load_index(CSV_FILE, schedule_version)
+    return tipoff_index().index(tz_name)
+
+
+# Spec cached per window; long windows are binned so the payload stays small.
+# The on-disk cache lets other worker processes reuse it too. In memory only
+# the most recent windows are kept (a spec can be ~60 KB, and the popular
+# ones are warmed anyway); the rest come back from disk.
+@st.cache_data(max_entries=64)
+def load_heatmap_spec(csv_path, version, start_date, end_date, tz_name=SCHEDULE_TZ):
+    return open_shared_cache().get_or_compute(
+        version,
+        heatmap_cache_key(tz_name, start_date, end_date),
+        lambda: heatmap_spec(index_for(tz_name), start_date, end_date),
+    )
+
 
 # =========================
-# BACK-TO-BACK MODE (IMMEDIATE)
+# Warm-up (once per process, then every 30 minutes)
 # =========================
-if show_back_to_back:
-    st.subheader("Teams playing today & tomorrow")
+# The shared files are built before the server starts by
+# `python warmup.py --run app3`; this fills the process's own caches from
+# them and keeps everything fresh.
+
+def warm_schedule():
+    version = file_version(CSV_FILE)
+    current_shared_index(CSV_FILE, version)
+    load_index(CSV_FILE, version)
+    load_default_views(CSV_FILE, VIEWS_FILE, version)
+    expanded = file_version(EXPANDED_CSV_FILE)
+    load_tipoff_index(EXPANDED_CSV_FILE, expanded)
+    load_projection_index(EXPANDED_CSV_FILE, expanded, SCHEDULE_TZ)
+
+
+def warm_popular_windows():
+    version = file_version(CSV_FILE)
+    for start, end in popular_windows(datetime.now(ZoneInfo(SCHEDULE_TZ)).date()):
+        load_heatmap_spec(CSV_FILE, version, start, end)
+
+
+# Watchlist alerts ride on the warm-up timer: the runner only re-evaluates
+# when the schedule, the rules or the date has changed, and the outbox drops
+# alerts another worker already queued.
+@st.cache_resource
+def alert_runner():
+    return AlertRunner(WATCHLIST_FILE)
+
+
+def check_watchlists():
+    if os.path.exists(WATCHLIST_FILE):
+        version = file_version(CSV_FILE)
+        today = datetime.now(ZoneInfo(SCHEDULE_TZ)).date()
+        alert_runner().run(load_index(CSV_FILE, version), version, today)
 
-    back_to_back_teams = get_back_to_back_teams(df, date.today())
+
+@st.cache_resource
+def start_warmup():
+    return Warmup([
+        ("background", lambda: get_base64_of_bin_file('background_court.jpg')),
+        ("schedule", warm_schedule),
+        ("popular windows", warm_popular_windows),
+        ("watchlist alerts", check_watchlists),
+    ], ready_file=ready_path("app3", os.getpid())).start()
+
+
+def show_compute_time(started):
+    st.caption(f"Computed in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+# =========================
+# BACK-TO-BACK PANEL
+# =========================
+# Each panel is a fragment: its widgets rerun only the panel itself, not the
+# styles, the header or the other panel.
+@st.fragment
+@profiled("back_to_back_panel")
+def back_to_back_panel():
+    show_back_to_back = st.checkbox(
+        "Show teams playing today & tomorrow (back-to-back)",
+        value=False
+    )
+    if not show_back_to_back:
+        return
+
+    started = time.perf_counter()
+    st.subheader("Teams playing today & tomorrow")
+    tz_name = user_timezone()
+    today = datetime.now(ZoneInfo(tz_name)).date()
+
+    # Today's ET B2B comes straight from the precomputed table; other zones
+    # use the tip-off index bucketed into their local days.
+    view = None
+    if tz_name == SCHEDULE_TZ:
+        view = lookup_default_view(load_default_views(CSV_FILE, VIEWS_FILE, schedule_version), today)
+    if view is not None:
+        back_to_back_teams = view["b2b"]
+    else:
+        back_to_back_teams = index_for(tz_name).get_back_to_back_teams(today)
 
     if back_to_back_teams:
         for i in range(0, len(back_to_back_teams), 3):
             st.write(", ".join(back_to_back_teams[i:i+3]))
     else:
         st.write("No teams play on both days.")
+    st.caption(f"Days in {tz_name}")
+    show_compute_time(started)
+
 
 # =========================
-# DATE RANGE MODE (BUTTON)
+# DATE RANGE PANEL (BUTTON)
 # =========================
-else:
+@st.fragment
+@profiled("date_range_panel")
+def date_range_panel():
+    tz_name = user_timezone()
+    today = datetime.now(ZoneInfo(tz_name)).date()
     use_today = st.checkbox("Start from today", value=False)
 
     if use_today:
-        start_date = date.today()
+        start_date = today
     else:
-        start_date = st.date_input("Start Date", value=date.today())
+        start_date = st.date_input("Start Date", value=today)
+
+    end_date = st.date_input("End Date", value=today + timedelta(days=7))
 
-    end_date = st.date_input("End Date", value=date.today())
+    slate_names = [name for name, _ in DEFAULT_SLATES]
+    slates = st.multiselect(
+        "Tip-off slates",
+        slate_names,
+        default=slate_names,
+        help=", ".join(f"{name}: from {start} ET" for name, start in DEFAULT_SLATES),
+    )
+    rank_by = st.radio("Rank teams by", ["Games", "Projected points"], horizontal=True)
 
     if st.button("Show games"):
-        games_series = games_per_team_in_range(df, start_date, end_date)
-        grouped = group_teams_by_games(games_series)
+        started = time.perf_counter()
+
+        if rank_by == "Projected points":
+            table = load_projection_index(EXPANDED_CSV_FILE, expanded_version, tz_name).window_table(start_date, end_date)
+            if table.empty:
+                st.write("No games in this range.")
+            else:
+                st.dataframe(table, hide_index=True)
+                st.caption("Team points from rolling scoring against the opponent's points allowed; "
+                           "games already played count their real score. Covers all slates.")
+            show_compute_time(started)
+            return
+
+        # Today..today+7 is precomputed; other ranges hit the cached index,
+        # and a subset of slates the per-slate counts.
+        view = None
+        if tz_name == SCHEDULE_TZ and len(slates) == len(slate_names):
+            view = lookup_default_view(load_default_views(CSV_FILE, VIEWS_FILE, schedule_version), start_date, end_date)
+        if view is not None:
+            grouped = group_teams_by_games(view["range"])
+        elif len(slates) < len(slate_names):
+            slate_index = tipoff_index().slate_index(tz_name)
+            grouped = group_teams_by_games(slate_index.ranked_games(start_date, end_date, slates))
+        else:
+            grouped = group_teams_by_games(index_for(tz_name).ranked_games(start_date, end_date))
 
         for games_count in sorted(grouped.keys(), reverse=True):
             st.markdown(f"### Teams playing {games_count} games")
@@ -168,6 +335,42 @@ else:
 
             for i in range(0, len(teams), 3):
                 st.write(", ".join(teams[i:i+3]))
+        if grouped:
+            st.divider()
+            st.vega_lite_chart(load_heatmap_spec(*source_for(tz_name), start_date, end_date, tz_name))
+            overlaps = tipoff_index().overlaps(start_date, end_date, tz_name)
+            if not overlaps.empty:
+                with st.expander(f"Overlapping tip-offs (busiest moment: {overlaps['Concurrent'].max()} games at once)"):
+                    st.dataframe(overlaps, hide_index=True)
+                    st.caption(f"Local tip-off times; a game counts as running for {GAME_MINUTES // 60}h{GAME_MINUTES % 60:02d} after it starts.")
+        show_compute_time(started)
+
 
-        #st.divider()
-        #st.bar_chart(games_series)
+# =========================
+# PAGE
+# =========================
+def main():
+    global schedule_version, expanded_version
+    page_header()
+
+    # Keyed by the file hashes, so editing either CSV invalidates the caches
+    # built from it (other zones and slates come from the expanded file).
+    # Fragment reruns keep the versions from the last full rerun.
+    schedule_version = file_version(CSV_FILE)
+    expanded_version = file_version(EXPANDED_CSV_FILE)
+
+    warmup = start_warmup()
+    if not warmup.ready.is_set():
+        st.caption("Warming up caches, first results may take a moment…")
+
+    back_to_back_panel()
+    st.divider()
+    date_range_panel()
+
+
+# B2B_PROFILE_RATE (or ?profile=1, where allowed) captures a full rerun
+# here, styles and warm-up included; fragment-only reruns are captured by
+# the panels' own @profiled wrappers.
+with profiled_rerun("app3") as rerun_capture:
+    main()
+show_profile_summary(rerun_capture)
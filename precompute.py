@@ -0,0 +1,136 @@
+"""
+Precompute the default dashboard views for every day of the season.
+
+For each date D the table holds:
+    range  teams -> games for D .. D+7 (the Edge app's default date_input)
+    b2b    teams playing on D and D+1
+
+The table is tagged with the schedule file's hash and rebuilt whenever the
+schedule changes, so a default page load is a dict lookup.
+
+    python precompute.py --csv schedule_comma_separated.csv --out default_views.json
+"""
+import argparse
+import hashlib
+import json
+import os
+from datetime import timedelta
+
+import numpy as np
+
+from schedule_data import ScheduleIndex, load_schedule, rank_totals
+
+CSV_FILE = "schedule_comma_separated.csv"
+VIEWS_FILE = os.environ.get("B2B_VIEWS_PATH", "default_views.json")
+DEFAULT_WINDOW_DAYS = 7
+
+
+def file_version(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def build_default_views(index, window_days=DEFAULT_WINDOW_DAYS, starts=None):
+    n_days = index.n_days
+    if starts is None:
+        starts = np.arange(-window_days, n_days)
+    # One row of window totals per start day, all in a single pass.
+    lo = np.clip(starts, 0, n_days)
+    hi = np.clip(starts + window_days + 1, 0, n_days)
+    totals = (index.cumulative[:, hi] - index.cumulative[:, lo]).T
+
+    views = {}
+    for start, row in zip(starts.tolist(), totals):
+        b2b = []
+        if 0 <= start < n_days - 1:
+            b2b = [index.teams[i] for i in np.flatnonzero(index.back_to_back[:, start])]
+        views[index.date_of(start).isoformat()] = {
+            "range": rank_totals(index.teams, row),
+            "b2b": b2b,
+        }
+    return views
+
+
+def update_default_views(table, index, changed_days):
+    """
+    Recompute only the days whose window or B2B pair covers a changed day.
+    Returns how many days were rewritten.
+    """
+    window_days = table["window_days"]
+    starts = sorted({
+        start for day in changed_days
+        for start in range(day - window_days, day + 1)
+    })
+    if not starts:
+        return 0
+    views = build_default_views(index, window_days, np.array(starts))
+    table["views"].update(views)
+    return len(views)
+
+
+def write_json_atomic(data, path):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def load_default_views(path, version):
+    """Return the stored table, or None if it is missing or for another schedule."""
+    try:
+        with open(path) as f:
+            table = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if table.get("version") != version:
+        return None
+    return table
+
+
+def refresh_default_views(csv_path=CSV_FILE, out_path=VIEWS_FILE,
+                          window_days=DEFAULT_WINDOW_DAYS, force=False):
+    version = file_version(csv_path)
+    table = None if force else load_default_views(out_path, version)
+    if table is not None and table.get("window_days") == window_days:
+        return table
+
+    index = ScheduleIndex(load_schedule(csv_path))
+    table = {
+        "version": version,
+        "window_days": window_days,
+        "views": build_default_views(index, window_days),
+    }
+    try:
+        write_json_atomic(table, out_path)
+    except OSError:
+        pass  # read-only deploy: still serve the freshly built table
+    return table
+
+
+def lookup_default_view(table, start_date, end_date=None):
+    """
+    Precomputed view for start_date, or None when the table doesn't cover it.
+    If end_date is given it must match the table's window length.
+    """
+    if table is None:
+        return None
+    if end_date is not None and end_date != start_date + timedelta(days=table["window_days"]):
+        return None
+    return table["views"].get(start_date.isoformat())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute default views for every season day.")
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--out", default=VIEWS_FILE)
+    parser.add_argument("--days", type=int, default=DEFAULT_WINDOW_DAYS,
+                        help="window length after the start day")
+    parser.add_argument("--force", action="store_true", help="rebuild even if up to date")
+    args = parser.parse_args(argv)
+
+    table = refresh_default_views(args.csv, args.out, args.days, args.force)
+    print(f"{len(table['views'])} days -> {args.out} (schedule {table['version'][:10]})")
+
+
+if __name__ == "__main__":
+    main()
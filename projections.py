@@ -0,0 +1,145 @@
+"""
+Projected scoring per team over any window, from historical points.
+
+For every game on the schedule, each side gets an expected points total:
+its rolling scoring average plus how many points the opponent has been
+allowing, less the league average (so a good offence against a leaky
+defence projects above both). Rolling averages cover the last N games
+played before that day and are pulled toward the league average for teams
+with few games. Games already played count with their real score.
+
+The game's combined expected score stands in for pace: the box scores have
+no possessions, and a high-total game means more chances for everyone.
+
+Values are laid out like ScheduleIndex.counts (team x day) with running
+totals along the days, so ranking teams by projected points over a window
+is one subtraction, same as ranking them by games.
+
+    projections = ProjectionIndex(index, load_expanded_schedule("expanded schedule.csv"))
+    projections.ranked_points("2025-12-15", "2025-12-21")
+"""
+import numpy as np
+import pandas as pd
+
+from ratings import WINDOW
+from schedule_data import rank_totals
+
+PRIOR_GAMES = 5   # rolling averages are shrunk as if this many league-average games were played
+
+
+def rolling_sums(team, values, window):
+    """
+    (sum, count) of each team's last `window` values up to and including
+    every row. Rows must be grouped by team, in date order within a team.
+    """
+    n = len(team)
+    running = np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+    starts = np.flatnonzero(np.r_[True, team[1:] != team[:-1]]) if n else np.zeros(0, dtype=np.int64)
+    segment_start = np.repeat(starts, np.diff(np.r_[starts, n]))
+    lo = np.maximum(segment_start, np.arange(n) - window + 1)
+    hi = np.arange(n) + 1
+    return running[hi] - running[lo], hi - lo
+
+
+class ProjectionIndex:
+    def __init__(self, index, expanded, days=None, window=WINDOW):
+        """
+        index: ScheduleIndex whose teams/days the matrices line up with.
+        expanded: load_expanded_schedule() rows. days: each row's day in the
+        index's calendar (defaults to expanded["Date"], i.e. ET days).
+        """
+        self.index = index
+        n_teams = len(index.teams)
+        days = expanded["Date"] if days is None else days
+        day = np.array([index.day_of(d) for d in days], dtype=np.int64)
+        home = expanded["Home Team"].map(index.team_pos).to_numpy()
+        away = expanded["Away Team"].map(index.team_pos).to_numpy()
+        home_pts = expanded["Home PTS"].to_numpy(dtype=np.float64)
+        away_pts = expanded["Away PTS"].to_numpy(dtype=np.float64)
+        played = ~np.isnan(home_pts) & ~np.isnan(away_pts)
+
+        # Completed team-games sorted by (team, day), with rolling sums.
+        team = np.concatenate([home[played], away[played]])
+        team_day = np.concatenate([day[played], day[played]])
+        scored = np.concatenate([home_pts[played], away_pts[played]])
+        allowed = np.concatenate([away_pts[played], home_pts[played]])
+        order = np.lexsort((team_day, team))
+        team, team_day, scored, allowed = team[order], team_day[order], scored[order], allowed[order]
+        self.league_average = float(scored.mean()) if len(scored) else 0.0
+        scored_sum, counts = rolling_sums(team, scored, window)
+        allowed_sum, _ = rolling_sums(team, allowed, window)
+
+        # Each side's form entering the game day: its last completed game
+        # strictly before that day, found with one searchsorted on a packed
+        # (team, day) key.
+        stride = int(max(day.max(initial=0), team_day.max(initial=0))) + 2
+        keys = team * stride + team_day
+
+        def form(side):
+            """(scoring, allowing) averages for each game's `side` team."""
+            if not len(keys):
+                league = np.full(len(day), self.league_average)
+                return league, league
+            at = np.searchsorted(keys, side * stride + day, side="left") - 1
+            found = (at >= 0) & (team[np.maximum(at, 0)] == side)
+            at = np.maximum(at, 0)
+            n = np.where(found, counts[at], 0)
+            prior = PRIOR_GAMES * self.league_average
+            offence = np.where(found, scored_sum[at], 0.0)
+            defence = np.where(found, allowed_sum[at], 0.0)
+            return (offence + prior) / (n + PRIOR_GAMES), (defence + prior) / (n + PRIOR_GAMES)
+
+        home_offence, home_defence = form(home)
+        away_offence, away_defence = form(away)
+        expected_home = home_offence + away_defence - self.league_average
+        expected_away = away_offence + home_defence - self.league_average
+        self.home_points = np.where(played, home_pts, expected_home)
+        self.away_points = np.where(played, away_pts, expected_away)
+        game_total = self.home_points + self.away_points
+
+        self.points = np.zeros((n_teams, index.n_days), dtype=np.float32)
+        self.pace = np.zeros((n_teams, index.n_days), dtype=np.float32)
+        inside = (day >= 0) & (day < index.n_days)
+        np.add.at(self.points, (home[inside], day[inside]), self.home_points[inside])
+        np.add.at(self.points, (away[inside], day[inside]), self.away_points[inside])
+        np.add.at(self.pace, (home[inside], day[inside]), game_total[inside])
+        np.add.at(self.pace, (away[inside], day[inside]), game_total[inside])
+
+        self.cumulative_points = np.zeros((n_teams, index.n_days + 1), dtype=np.float64)
+        np.cumsum(self.points, axis=1, out=self.cumulative_points[:, 1:])
+        self.cumulative_pace = np.zeros((n_teams, index.n_days + 1), dtype=np.float64)
+        np.cumsum(self.pace, axis=1, out=self.cumulative_pace[:, 1:])
+
+    def _window(self, cumulative, start_date, end_date):
+        start, end = self.index.window_bounds(start_date, end_date)
+        if start > end:
+            return np.zeros(len(self.index.teams))
+        return cumulative[:, end + 1] - cumulative[:, start]
+
+    def window_points(self, start_date, end_date):
+        """Projected team points per team (index.teams order) between two dates, inclusive."""
+        return self._window(self.cumulative_points, start_date, end_date)
+
+    def window_pace(self, start_date, end_date):
+        """Sum of expected combined scores of each team's games in the window."""
+        return self._window(self.cumulative_pace, start_date, end_date)
+
+    def ranked_points(self, start_date, end_date):
+        """Dict of team -> projected points, highest first (ties by name); teams without games left out."""
+        games = self.index.window_totals(start_date, end_date)
+        return rank_totals(self.index.teams, self.window_points(start_date, end_date), keep=games)
+
+    def window_table(self, start_date, end_date):
+        """Team / Games / Proj Pts / Pts per Game / Game Total per Game, sorted by Proj Pts."""
+        games = self.index.window_totals(start_date, end_date)
+        points = self.window_points(start_date, end_date)
+        pace = self.window_pace(start_date, end_date)
+        played = np.flatnonzero(games)
+        table = pd.DataFrame({
+            "Team": [self.index.teams[i] for i in played],
+            "Games": games[played].astype(int),
+            "Proj Pts": points[played].round(1),
+            "Pts per Game": (points[played] / games[played]).round(1),
+            "Game Total per Game": (pace[played] / games[played]).round(1),
+        })
+        return table.sort_values("Proj Pts", ascending=False, kind="stable").reset_index(drop=True)
@@ -0,0 +1,176 @@
+"""
+Rolling defensive ratings and opponent tiers from box scores.
+
+Replaces the hand-maintained ratings tab: for every team, the average points
+allowed over its last N games (15, like the sheet), kept as a running sum
+over a fixed-length queue per team. Each box score is one O(1) update, and
+update() only replays games it hasn't seen, so appending a night's scores
+to "expanded schedule.csv" costs a handful of games, not the season. A
+corrected score for a game already applied replays the season once.
+
+Ratings are kept as of the end of every day from the first box score on,
+and tiers are a ranking of those: the third of teams allowing the most
+points are Pushovers, the third allowing the fewest are Lockdowns.
+
+    ratings = DefenseRatings.from_csv()
+    ratings.tier_table()                 # latest, Team/Tier/Emoji like the sheet
+    ratings.tier_table("2025-12-08")     # as of the end of that day
+    ratings.update(load_expanded_schedule("expanded schedule.csv"))
+"""
+import argparse
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from schedule_data import load_expanded_schedule, to_date
+from tipoff_index import EXPANDED_CSV_FILE
+
+WINDOW = 15
+TIERS = ["Pushover", "Neutral", "Lockdown"]
+TIER_EMOJIS = {"Pushover": "🟢", "Neutral": "⚪", "Lockdown": "🔴"}
+
+
+def completed_games(df):
+    """Rows of an expanded schedule that have a final score, in date order."""
+    done = df.dropna(subset=["Home PTS", "Away PTS"])
+    return done.sort_values("Date", kind="stable")
+
+
+class DefenseRatings:
+    def __init__(self, teams, window=WINDOW):
+        self.teams = sorted(teams)
+        self.team_pos = {team: i for i, team in enumerate(self.teams)}
+        self.window = window
+        self._reset()
+
+    def _reset(self):
+        n_teams = len(self.teams)
+        self._recent = [deque() for _ in range(n_teams)]
+        self._sums = np.zeros(n_teams, dtype=np.float64)
+        self._seen = {}     # (date, home, away) -> (home pts, away pts) applied
+        self.first_ordinal = None
+        self.last_ordinal = None
+        # One row per day from first_ordinal: average allowed at the end of
+        # that day (NaN until a team has played).
+        self._history = []
+
+    @classmethod
+    def from_csv(cls, csv_path=EXPANDED_CSV_FILE, window=WINDOW):
+        df = load_expanded_schedule(csv_path)
+        ratings = cls(set(df["Home Team"]).union(df["Away Team"]), window)
+        ratings.update(df)
+        return ratings
+
+    # =========================
+    # Updates
+    # =========================
+
+    def _allow(self, team, points):
+        t = self.team_pos[team]
+        recent = self._recent[t]
+        recent.append(points)
+        self._sums[t] += points
+        if len(recent) > self.window:
+            self._sums[t] -= recent.popleft()
+        self._history[-1][t] = self._sums[t] / len(recent)
+
+    def add_game(self, when, home, home_pts, away, away_pts):
+        """One box score; games must arrive in date order."""
+        ordinal = to_date(when).toordinal()
+        if self.first_ordinal is None:
+            self.first_ordinal = self.last_ordinal = ordinal
+            self._history.append(np.full(len(self.teams), np.nan))
+        if ordinal < self.last_ordinal:
+            raise ValueError(f"box score for {to_date(when)} arrived after later days were recorded")
+        while self.last_ordinal < ordinal:
+            self._history.append(self._history[-1].copy())
+            self.last_ordinal += 1
+
+        self._allow(home, float(away_pts))
+        self._allow(away, float(home_pts))
+
+    def update(self, df):
+        """
+        Apply the completed games in df that haven't been seen yet and return
+        how many there were. A late score for a day that's already closed
+        (a postponed game filled in out of order) or a changed score for a
+        game already applied (a correction) replays everything from the
+        start instead.
+        """
+        done = completed_games(df)
+        keys = list(zip(done["Date"].dt.date, done["Home Team"], done["Away Team"]))
+        scores = list(zip(done["Home PTS"].astype(float), done["Away PTS"].astype(float)))
+        new = [i for i, key in enumerate(keys) if self._seen.get(key) != scores[i]]
+        if not new:
+            return 0
+
+        corrected = any(keys[i] in self._seen for i in new)
+        first_new = keys[new[0]][0].toordinal()
+        if corrected or (self.last_ordinal is not None and first_new < self.last_ordinal):
+            self._reset()
+            new = range(len(keys))
+
+        rows = done.iloc[list(new)]
+        for when, home, home_pts, away, away_pts in zip(
+            rows["Date"], rows["Home Team"], rows["Home PTS"], rows["Away Team"], rows["Away PTS"]
+        ):
+            self.add_game(when, home, home_pts, away, away_pts)
+        self._seen.update((keys[i], scores[i]) for i in new)
+        return len(new)
+
+    # =========================
+    # Queries
+    # =========================
+
+    @property
+    def n_days(self):
+        return len(self._history)
+
+    def points_allowed(self, as_of=None):
+        """Average points allowed over each team's last N games, as of the end of a day."""
+        if not self._history:
+            return pd.Series(np.nan, index=self.teams)
+        day = self.n_days - 1 if as_of is None else to_date(as_of).toordinal() - self.first_ordinal
+        if day < 0:
+            return pd.Series(np.nan, index=self.teams)
+        return pd.Series(self._history[min(day, self.n_days - 1)], index=self.teams)
+
+    def tier_table(self, as_of=None):
+        """Team / Tier / Emoji (plus the rating behind it), the shape of the ratings sheet."""
+        allowed = self.points_allowed(as_of)
+        rated = allowed.dropna()
+        third = len(rated) // 3
+        # Most points allowed first; ties keep team order.
+        order = rated.sort_values(ascending=False, kind="stable").index
+        pushover, neutral, lockdown = TIERS
+        tiers = pd.Series(neutral, index=self.teams)
+        if third:
+            tiers[order[:third]] = pushover
+            tiers[order[-third:]] = lockdown
+        return pd.DataFrame({
+            "Team": self.teams,
+            "Tier": tiers.to_numpy(),
+            "Emoji": tiers.map(TIER_EMOJIS).to_numpy(),
+            f"Pts Allowed (Last {self.window})": allowed.round(1).to_numpy(),
+        })
+
+    def rating_map(self, as_of=None):
+        """{team: {'Tier', 'Emoji'}} for MatchupIndex.window_stats."""
+        return self.tier_table(as_of).set_index("Team")[["Tier", "Emoji"]].to_dict("index")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Opponent tiers from rolling points allowed.")
+    parser.add_argument("--csv", default=EXPANDED_CSV_FILE)
+    parser.add_argument("--window", type=int, default=WINDOW, help="games per rolling window")
+    parser.add_argument("--as-of", help="YYYY-MM-DD (default: latest box score)")
+    args = parser.parse_args(argv)
+
+    ratings = DefenseRatings.from_csv(args.csv, args.window)
+    table = ratings.tier_table(args.as_of)
+    print(table.sort_values(table.columns[-1], ascending=False).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Opt-in cProfile + tracemalloc capture of a single app rerun.
+
+Off unless asked for:
+
+    B2B_PROFILE_RATE=0.01       profile one rerun in 1% of sessions
+    ?profile=1                  in the URL: profile every rerun of that tab,
+                                only honoured with B2B_PROFILE_ALLOW_PARAM=1
+                                (so a public URL can't fill the disk)
+
+Each capture writes <timestamp>-<label>-<pid>.prof (load it with pstats or
+snakeviz) and a matching .txt with the top functions by cumulative time and
+the top allocating lines, under B2B_PROFILE_DIR (default "profiles"). Only
+the newest B2B_PROFILE_KEEP captures (default 200) are kept. The app shows
+a short summary under the profiled panel.
+
+Both profilers are process-wide in effect (tracemalloc sees every thread's
+allocations), so only one capture runs at a time per process and captures
+are at least MIN_INTERVAL seconds apart; a request that can't be honoured
+just runs unprofiled.
+
+    with profiled_rerun("app3") as capture:
+        ...
+    show_profile_summary(capture)      # capture.profile is None if not captured
+"""
+import cProfile
+import functools
+import io
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+PROFILE_DIR = os.environ.get("B2B_PROFILE_DIR", "profiles")
+PROFILE_RATE = float(os.environ.get("B2B_PROFILE_RATE", "0"))
+MIN_INTERVAL = float(os.environ.get("B2B_PROFILE_MIN_INTERVAL", "10"))
+ALLOW_PARAM = os.environ.get("B2B_PROFILE_ALLOW_PARAM", "0") == "1"
+KEEP = int(os.environ.get("B2B_PROFILE_KEEP", "200"))
+TOP_N = 15
+
+_capture_lock = threading.Lock()
+_active = threading.local()
+_last_capture = 0.0
+
+
+class RerunProfile:
+    def __init__(self, label, wall, cpu, peak_bytes, top_functions, top_allocations, prof_path, report_path):
+        self.label = label
+        self.wall = wall
+        self.cpu = cpu
+        self.peak_bytes = peak_bytes
+        self.top_functions = top_functions
+        self.top_allocations = top_allocations
+        self.prof_path = prof_path
+        self.report_path = report_path
+
+
+# =========================
+# Trigger
+# =========================
+
+def profile_requested():
+    """True if this rerun should be profiled (query param or session sample)."""
+    if ALLOW_PARAM and st.query_params.get("profile") == "1":
+        return True
+    if PROFILE_RATE <= 0:
+        return False
+    # Decided once per session; a sampled session gets one profiled rerun.
+    if "_profile_pending" not in st.session_state:
+        st.session_state["_profile_pending"] = random.random() < PROFILE_RATE
+    if st.session_state["_profile_pending"]:
+        st.session_state["_profile_pending"] = False
+        return True
+    return False
+
+
+def _claim():
+    global _last_capture
+    if not _capture_lock.acquire(blocking=False):
+        return False
+    if time.monotonic() - _last_capture < MIN_INTERVAL:
+        _capture_lock.release()
+        return False
+    _last_capture = time.monotonic()
+    return True
+
+
+# =========================
+# Capture
+# =========================
+
+def _top_functions(stats):
+    rows = []
+    for (filename, line, name), (_, ncalls, _, cumtime, _) in stats.stats.items():
+        rows.append((f"{os.path.basename(filename)}:{line}({name})", ncalls, cumtime))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:TOP_N]
+
+
+def _top_allocations(snapshot):
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    return [
+        (f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}", stat.size, stat.count)
+        for stat in snapshot.statistics("lineno")[:TOP_N]
+    ]
+
+
+def _write_report(profile, stats):
+    buffer = io.StringIO()
+    print(f"{profile.label}: {profile.wall * 1e3:.1f} ms wall, {profile.cpu * 1e3:.1f} ms CPU, "
+          f"peak traced {profile.peak_bytes / 2**20:.1f} MB", file=buffer)
+    print("\nTop allocations (size, blocks):", file=buffer)
+    for where, size, count in profile.top_allocations:
+        print(f"  {size / 1024:10.1f} KiB {count:8d}  {where}", file=buffer)
+    print(file=buffer)
+    stats.stream = buffer
+    stats.sort_stats("cumulative").print_stats(40)
+    with open(profile.report_path, "w") as f:
+        f.write(buffer.getvalue())
+
+
+def _prune(directory, keep=KEEP):
+    """Delete all but the newest `keep` captures (names start with a timestamp)."""
+    stems = sorted({os.path.splitext(name)[0] for name in os.listdir(directory)
+                    if name.endswith((".prof", ".txt"))})
+    for stem in stems[:max(len(stems) - keep, 0)]:
+        for ext in (".prof", ".txt"):
+            try:
+                os.remove(os.path.join(directory, stem + ext))
+            except FileNotFoundError:
+                pass  # another process pruned it first
+
+
+class profiled_rerun:
+    """
+    Context manager; after the block, .profile is the RerunProfile if this
+    rerun was captured, else None. Nested uses inside a capture do nothing.
+    """
+
+    def __init__(self, label):
+        self.label = label
+        self.profile = None
+        self._profiler = None
+
+    def __enter__(self):
+        if getattr(_active, "capture", None) is not None:
+            return self
+        if not profile_requested() or not _claim():
+            return self
+
+        _active.capture = self
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self._profiler is None:
+            return False
+        try:
+            self._profiler.disable()
+            wall = time.perf_counter() - self._started
+            cpu = time.process_time() - self._cpu_started
+            peak = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            stem = os.path.join(PROFILE_DIR, f"{datetime.now():%Y%m%d-%H%M%S-%f}-{self.label}-{os.getpid()}")
+            self._profiler.dump_stats(f"{stem}.prof")
+            stats = pstats.Stats(self._profiler)
+            self.profile = RerunProfile(
+                self.label, wall, cpu, peak, _top_functions(stats), _top_allocations(snapshot),
+                f"{stem}.prof", f"{stem}.txt",
+            )
+            _write_report(self.profile, stats)
+            _prune(PROFILE_DIR)
+        finally:
+            _active.capture = None
+            _capture_lock.release()
+        return False
+
+
+def profiled(label):
+    """Decorator for fragments, so a fragment-only rerun can be captured too."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profiled_rerun(label) as capture:
+                result = fn(*args, **kwargs)
+            show_profile_summary(capture)
+            return result
+        return wrapper
+    return decorate
+
+
+# =========================
+# Display
+# =========================
+
+def show_profile_summary(capture):
+    profile = capture.profile if capture is not None else None
+    if profile is None:
+        return
+    with st.expander(f"⏱️ Profiled {profile.label}: {profile.wall * 1e3:.0f} ms wall, "
+                     f"{profile.cpu * 1e3:.0f} ms CPU, peak {profile.peak_bytes / 2**20:.1f} MB"):
+        st.dataframe(
+            pd.DataFrame(profile.top_functions, columns=["Function", "Calls", "Cumulative s"]),
+            hide_index=True,
+        )
+        allocations = pd.DataFrame(profile.top_allocations, columns=["Line", "Bytes", "Blocks"])
+        st.dataframe(allocations, hide_index=True)
+        st.caption(f"Saved {profile.prof_path} and {profile.report_path}")
@@ -0,0 +1,129 @@
+"""
+Player-level view of the schedule for a fantasy roster.
+
+A roster is a dict of player -> NBA team. Each day at most `slots` players
+can be started, so a roster's usable games in a window is
+
+    sum over days of min(players whose team plays that day, slots)
+
+Everything is computed from the ScheduleIndex team x day matrix, so
+evaluating many add/drop swaps is one (swaps x days) array operation.
+"""
+import numpy as np
+
+from schedule_data import DEFAULT_RATING, TIER_SCORES
+
+DEFAULT_SLOTS = 10
+
+
+def window_days(index, start_date, end_date):
+    start, end = index.window_bounds(start_date, end_date)
+    return slice(start, max(end + 1, start))
+
+
+def team_rows(index, teams):
+    try:
+        return np.array([index.team_pos[team] for team in teams], dtype=np.intp)
+    except KeyError as e:
+        raise ValueError(f"unknown team {e.args[0]!r}") from None
+
+
+def playing_matrix(index, start_date, end_date):
+    """(teams x days) 0/1 int8: does team t play on window day d."""
+    return (index.counts[:, window_days(index, start_date, end_date)] > 0).astype(np.int8)
+
+
+def evaluate_roster(index, roster, start_date, end_date, slots=DEFAULT_SLOTS):
+    plays = playing_matrix(index, start_date, end_date)
+    player_plays = plays[team_rows(index, roster.values())]
+    daily = player_plays.sum(axis=0)
+
+    return {
+        "player_games": dict(zip(roster.keys(), player_plays.sum(axis=1).tolist())),
+        "games": int(daily.sum()),
+        "usable": int(np.minimum(daily, slots).sum()),
+        "benched": int(np.maximum(daily - slots, 0).sum()),
+    }
+
+
+def evaluate_swaps(index, roster, swaps, start_date, end_date, slots=DEFAULT_SLOTS):
+    """
+    Usable games for each (drop_player, add_team) swap in one pass.
+
+    Returns an int array aligned with swaps. drop_player may be None to
+    evaluate adding a team to an open roster spot.
+    """
+    plays = playing_matrix(index, start_date, end_date)
+    daily = plays[team_rows(index, roster.values())].sum(axis=0)
+
+    # Row n_teams of the padded matrix is all zeros: "drop nobody".
+    padded = np.vstack([plays, np.zeros((1, plays.shape[1]), dtype=np.int8)])
+    none_row = plays.shape[0]
+    drop_rows = np.array(
+        [none_row if player is None else index.team_pos[roster[player]] for player, _ in swaps],
+        dtype=np.intp,
+    )
+    add_rows = team_rows(index, [team for _, team in swaps])
+
+    swapped = daily[None, :] - padded[drop_rows] + padded[add_rows]
+    return np.minimum(swapped, slots).sum(axis=1)
+
+
+def all_swaps(index, roster):
+    """Every drop of a current player for every team, plus pure adds."""
+    return [
+        (player, team)
+        for player in [None, *roster]
+        for team in index.teams
+    ]
+
+
+# =========================
+# Streaming pickups
+# =========================
+
+def opponent_scores(games, ratings, start_date, end_date):
+    """
+    Quality Score per team (in games.teams order) for the window: +1 per game
+    against a Pushover defence, -1 per game against a Lockdown one.
+    ratings is the Edge app's rating_map: team -> {"Tier": ..., "Emoji": ...}.
+    """
+    weights = np.array(
+        [TIER_SCORES.get(ratings.get(team, DEFAULT_RATING).get("Tier"), 0) for team in games.teams],
+        dtype=np.int16,
+    )
+    window = games.window(start_date, end_date)
+    return np.bincount(
+        games.team[window],
+        weights=weights[games.opponent[window]],
+        minlength=len(games.teams),
+    ).astype(int)
+
+
+def rank_streamers(index, games, roster, start_date, end_date, ratings=None,
+                   drop=None, slots=DEFAULT_SLOTS, top_n=10):
+    """
+    Rank every team as a streaming pickup: usable games gained over the
+    current roster (dropping `drop`, or into an open spot), then Quality Score.
+    games must be a TeamGames built with teams=index.teams.
+    """
+    base = evaluate_roster(index, roster, start_date, end_date, slots)["usable"]
+    gained = evaluate_swaps(
+        index, roster, [(drop, team) for team in index.teams], start_date, end_date, slots
+    ) - base
+    played = index.window_totals(start_date, end_date)
+    if ratings:
+        score = opponent_scores(games, ratings, start_date, end_date)
+    else:
+        score = np.zeros(len(index.teams), dtype=int)
+
+    order = np.lexsort((-score, -gained))[:top_n]
+    return [
+        {
+            "team": index.teams[i],
+            "usable_gained": int(gained[i]),
+            "games": int(played[i]),
+            "score": int(score[i]),
+        }
+        for i in order
+    ]
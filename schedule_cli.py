@@ -0,0 +1,152 @@
+"""
+Batch mode for the schedule queries in basic_logic.ipynb.
+
+Loads the schedule once and answers one query per line:
+
+    2025-12-29 2026-01-06     games per team in the window (inclusive)
+    b2b 2025-12-29            teams playing on that day and the next
+    stream 2025-12-29 2026-01-04
+                              best streaming pickups for --roster in the window
+
+Blank lines and lines starting with # are ignored.
+
+    python schedule_cli.py queries.txt
+    python schedule_cli.py queries.txt --roster roster.csv --ratings ratings.csv
+    cat queries.txt | python schedule_cli.py --format json
+"""
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+from precompute import CSV_FILE
+from roster import DEFAULT_SLOTS, rank_streamers
+from schedule_data import ScheduleIndex, group_teams_by_games, load_schedule
+from team_games import TeamGames
+
+
+def parse_queries(lines):
+    for line_no, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.split()
+        if len(parts) == 2 and parts[0].lower() == "b2b":
+            yield {"type": "b2b", "date": parts[1]}
+        elif len(parts) == 3 and parts[0].lower() == "stream":
+            yield {"type": "stream", "start": parts[1], "end": parts[2]}
+        elif len(parts) == 2:
+            yield {"type": "range", "start": parts[0], "end": parts[1]}
+        else:
+            raise ValueError(f"line {line_no}: can't parse query {line!r}")
+
+
+def load_roster(csv_path):
+    """CSV with Player and Team columns -> {player: team}."""
+    df = pd.read_csv(csv_path)
+    df.columns = df.columns.str.strip().str.title()
+    return dict(zip(df["Player"], df["Team"]))
+
+
+def load_ratings(csv_path):
+    """CSV laid out like the Edge app's ratings sheet -> its rating_map."""
+    df = pd.read_csv(csv_path)
+    df.columns = df.columns.str.strip().str.title()
+    return df.set_index('Team')[['Tier', 'Emoji']].to_dict('index')
+
+
+def answer_query(index, query, context=None):
+    if query["type"] == "b2b":
+        return dict(query, teams=index.get_back_to_back_teams(query["date"]))
+
+    if query["type"] == "stream":
+        if not context or context.get("roster") is None:
+            raise ValueError("stream queries need --roster")
+        return dict(query, streamers=rank_streamers(
+            index, context["games"], context["roster"], query["start"], query["end"],
+            ratings=context.get("ratings"), drop=context.get("drop"),
+            slots=context["slots"], top_n=context["top"],
+        ))
+
+    grouped = group_teams_by_games(index.ranked_games(query["start"], query["end"]))
+    return dict(query, games={
+        str(count): grouped[count] for count in sorted(grouped, reverse=True)
+    })
+
+
+def print_text(result, batch_size, out):
+    if result["type"] == "stream":
+        print(f"== Streamers {result['start']} to {result['end']} ==", file=out)
+        for rank, pick in enumerate(result["streamers"], 1):
+            print(f"{rank}. {pick['team']}: {pick['usable_gained']:+d} usable "
+                  f"({pick['games']} games, Quality Score {pick['score']})", file=out)
+        print(file=out)
+        return
+
+    if result["type"] == "b2b":
+        print(f"== Back-to-back on {result['date']} ==", file=out)
+        teams = result["teams"]
+        if not teams:
+            print("No teams play on both days.", file=out)
+        for i in range(0, len(teams), batch_size):
+            print(", ".join(teams[i:i+batch_size]), file=out)
+        print(file=out)
+        return
+
+    print(f"== {result['start']} to {result['end']} ==", file=out)
+    for games_count, teams in result["games"].items():
+        print(f"Teams playing {games_count} games:", file=out)
+        for i in range(0, len(teams), batch_size):
+            print(", ".join(teams[i:i+batch_size]), file=out)
+        print(file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer many schedule queries in one run.")
+    parser.add_argument("queries", nargs="?", default="-",
+                        help="file with one query per line (default: stdin)")
+    parser.add_argument("--csv", default=CSV_FILE, help="schedule CSV (Date in dd/mm/yyyy)")
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    parser.add_argument("--batch-size", type=int, default=3, help="teams per line in text output")
+    parser.add_argument("--roster", help="CSV of Player,Team for stream queries")
+    parser.add_argument("--ratings", help="CSV of Team,Tier,Emoji for Quality Scores")
+    parser.add_argument("--drop", help="roster player the streamer replaces (default: open spot)")
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS, help="starters per day")
+    parser.add_argument("--top", type=int, default=10, help="streamers to list")
+    args = parser.parse_args(argv)
+
+    df = load_schedule(args.csv)
+    index = ScheduleIndex(df)
+    context = {
+        "games": TeamGames.from_schedule(df, index.teams),
+        "roster": load_roster(args.roster) if args.roster else None,
+        "ratings": load_ratings(args.ratings) if args.ratings else None,
+        "drop": args.drop,
+        "slots": args.slots,
+        "top": args.top,
+    }
+    if args.drop and args.drop not in (context["roster"] or {}):
+        parser.error(f"--drop {args.drop!r} is not on the roster")
+
+    if args.queries == "-":
+        lines = sys.stdin.readlines()
+    else:
+        with open(args.queries) as f:
+            lines = f.readlines()
+
+    try:
+        results = [answer_query(index, q, context) for q in parse_queries(lines)]
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.format == "json":
+        json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    else:
+        for result in results:
+            print_text(result, args.batch_size, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+
+
+# =========================
+# Data helpers (NO Streamlit here)
+# =========================
+
+def load_schedule(csv_path):
+    df = pd.read_csv(csv_path)
+    df["Date"] = pd.to_datetime(df["Date"], format="%d/%m/%Y")
+    return df
+
+
+def load_expanded_schedule(csv_path):
+    """
+    "expanded schedule.csv" (basketball-reference export) with the columns
+    renamed to match load_schedule: Date, Start (ET), Away Team, Away PTS,
+    Home Team, Home PTS. PTS are NaN for games not played yet.
+    """
+    df = pd.read_csv(csv_path)
+    df = df.rename(columns={
+        "Visitor/Neutral": "Away Team", "PTS": "Away PTS",
+        "Home/Neutral": "Home Team", "PTS.1": "Home PTS",
+    })
+    df["Date"] = pd.to_datetime(df["Date"], format="%a %b %d %Y")
+    return df
+
+
+def games_per_team_in_range(df, start_date, end_date):
+    start_date = pd.to_datetime(start_date)
+    end_date = pd.to_datetime(end_date)
+
+    df = df[(df["Date"] >= start_date) & (df["Date"] <= end_date)]
+
+    home = df["Home Team"].value_counts()
+    away = df["Away Team"].value_counts()
+
+    return home.add(away, fill_value=0).astype(int).sort_values(ascending=False)
+
+
+def teams_playing_on_date(df, target_date):
+    return set(
+        df[df["Date"] == target_date]["Home Team"]
+    ).union(
+        set(df[df["Date"] == target_date]["Away Team"])
+    )
+
+
+def get_back_to_back_teams(df, base_date):
+    today = pd.to_datetime(base_date)
+    tomorrow = today + pd.Timedelta(days=1)
+
+    teams_today = teams_playing_on_date(df, today)
+    teams_tomorrow = teams_playing_on_date(df, tomorrow)
+
+    return sorted(teams_today & teams_tomorrow)
+
+
+def group_teams_by_games(games_series):
+    grouped = {}
+    for team, games in games_series.items():
+        grouped.setdefault(games, []).append(team)
+    return grouped
+
+
+# Quality Score weights per opponent tier, and the rating of a team the
+# ratings don't cover.
+TIER_SCORES = {"Pushover": 1, "Lockdown": -1}
+DEFAULT_RATING = {'Tier': 'Neutral', 'Emoji': '⚪'}
+
+
+def team_quality_stats(df_schedule, start_date, end_date, rating_map, b2b_toggle=False):
+    """
+    The Edge app's original per-team loop: Games, Quality Score and
+    Matchups for each team in the window. Kept as the reference that
+    matchups.MatchupIndex.window_stats is checked against.
+    """
+    mask = (df_schedule['Date'].dt.date >= start_date) & (df_schedule['Date'].dt.date <= end_date)
+    filtered = df_schedule[mask]
+    all_teams = sorted(pd.concat([df_schedule['Home Team'], df_schedule['Away Team']]).unique())
+
+    team_stats = []
+    for team in all_teams:
+        games = filtered[(filtered['Home Team'] == team) | (filtered['Away Team'] == team)].sort_values('Date')
+        if b2b_toggle and len(games) < 2: continue
+        if not games.empty:
+            score = 0
+            matchups = []
+            for _, row in games.iterrows():
+                opp = row['Away Team'] if row['Home Team'] == team else row['Home Team']
+                info = rating_map.get(opp, DEFAULT_RATING)
+                if info['Tier'] == 'Pushover': score += 1
+                elif info['Tier'] == 'Lockdown': score -= 1
+                matchups.append(f"{info['Emoji']} vs {opp}")
+            team_stats.append({"Team": team, "Games": len(games), "Score": score, "Matchups": " | ".join(matchups)})
+    return team_stats
+
+
+# =========================
+# Schedule index (load once, query many times)
+# =========================
+
+def to_date(value):
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(value, pd.Timestamp):
+        return value.date()
+    return value
+
+
+def rank_totals(teams, totals, keep=None):
+    """
+    Dict of team -> total, highest first (ties keep team order). Only teams
+    where keep is true are listed; by default those with a non-zero total.
+    """
+    kept = np.flatnonzero(totals if keep is None else keep)
+    order = kept[np.argsort(-totals[kept], kind="stable")]
+    return dict(zip([teams[i] for i in order], totals[order].tolist()))
+
+
+class ScheduleIndex:
+    """
+    Team x day game counts built once from a schedule DataFrame.
+
+    counts[t, d] is how many games team t plays on day d (d = days since the
+    first scheduled date). cumulative holds running totals along each row so a
+    window count is a single subtraction.
+    """
+
+    def __init__(self, df):
+        self.teams = sorted(set(df["Home Team"]).union(df["Away Team"]))
+        self.team_pos = {team: i for i, team in enumerate(self.teams)}
+
+        first_day = df["Date"].min()
+        self.first_ordinal = first_day.date().toordinal()
+        days = (df["Date"] - first_day).dt.days.to_numpy()
+        self.n_days = int(days.max()) + 1
+
+        home = df["Home Team"].map(self.team_pos).to_numpy()
+        away = df["Away Team"].map(self.team_pos).to_numpy()
+
+        counts = np.zeros((len(self.teams), self.n_days), dtype=np.int8)
+        np.add.at(counts, (home, days), 1)
+        np.add.at(counts, (away, days), 1)
+        self.counts = counts
+        self._build_derived()
+
+    def _build_derived(self):
+        cumulative = np.zeros((len(self.teams), self.n_days + 1), dtype=np.int16)
+        np.cumsum(self.counts, axis=1, out=cumulative[:, 1:])
+        self.cumulative = cumulative
+
+        plays = self.counts > 0
+        self.back_to_back = plays[:, :-1] & plays[:, 1:]
+
+    def day_of(self, value):
+        return to_date(value).toordinal() - self.first_ordinal
+
+    def date_of(self, day):
+        return date.fromordinal(self.first_ordinal + day)
+
+    def window_bounds(self, start_date, end_date):
+        """(first, last) day of the window clipped to the season; first > last if it's empty."""
+        return max(self.day_of(start_date), 0), min(self.day_of(end_date), self.n_days - 1)
+
+    def window_totals(self, start_date, end_date):
+        """Games per team (in self.teams order) between two dates, inclusive."""
+        start, end = self.window_bounds(start_date, end_date)
+        if start > end:
+            return np.zeros(len(self.teams), dtype=np.int16)
+        return self.cumulative[:, end + 1] - self.cumulative[:, start]
+
+    def ranked_games(self, start_date, end_date):
+        """Dict of team -> games in the window, most games first (ties by name)."""
+        return rank_totals(self.teams, self.window_totals(start_date, end_date))
+
+    def games_per_team_in_range(self, start_date, end_date):
+        return pd.Series(self.ranked_games(start_date, end_date), dtype=int)
+
+    def teams_playing_on_date(self, target_date):
+        day = self.day_of(target_date)
+        if day < 0 or day >= self.n_days:
+            return set()
+        return {self.teams[i] for i in np.flatnonzero(self.counts[:, day])}
+
+    def get_back_to_back_teams(self, base_date):
+        day = self.day_of(base_date)
+        if day < 0 or day >= self.n_days - 1:
+            return []
+        return [self.teams[i] for i in np.flatnonzero(self.back_to_back[:, day])]
+
+    def apply_diff(self, diff):
+        """
+        Update counts, running totals and the B2B index in place for a
+        schedule diff (see schedule_diff.diff_schedules). Only the rows of
+        teams involved are touched, from the earliest changed day onward.
+
+        Returns the sorted list of changed day numbers (after any growth of
+        the day range, so they index the updated arrays).
+        """
+        deltas = []
+        for game in diff["removed"]:
+            deltas.append((game, game["date"], -1))
+        for game in diff["added"]:
+            deltas.append((game, game["date"], 1))
+        for game in diff["moved"]:
+            deltas.append((game, game["old_date"], -1))
+            deltas.append((game, game["new_date"], 1))
+        if not deltas:
+            return []
+
+        for game, _, _ in deltas:
+            for team in (game["home"], game["away"]):
+                if team not in self.team_pos:
+                    raise ValueError(f"unknown team {team!r}; rebuild the index instead")
+
+        days = [self.day_of(when) for _, when, _ in deltas]
+        if min(days) < 0 or max(days) >= self.n_days:
+            self._grow(min(days), max(days))
+            days = [self.day_of(when) for _, when, _ in deltas]
+            full_rebuild = True
+        else:
+            full_rebuild = False
+
+        rows = set()
+        for (game, _, step), day in zip(deltas, days):
+            for team in (game["home"], game["away"]):
+                t = self.team_pos[team]
+                self.counts[t, day] += step
+                rows.add(t)
+
+        if full_rebuild:
+            self._build_derived()
+        else:
+            rows = sorted(rows)
+            first = min(days)
+            block = self.counts[rows, first:].cumsum(axis=1, dtype=np.int16)
+            self.cumulative[rows, first + 1:] = block + self.cumulative[rows, first][:, None]
+
+            plays = self.counts[rows] > 0
+            lo, hi = max(first - 1, 0), min(max(days) + 1, self.n_days - 1)
+            self.back_to_back[rows, lo:hi] = plays[:, lo:hi] & plays[:, lo + 1:hi + 1]
+
+        return sorted(set(days))
+
+    def _grow(self, low_day, high_day):
+        pad_before = max(-low_day, 0)
+        pad_after = max(high_day - self.n_days + 1, 0)
+        self.counts = np.pad(self.counts, ((0, 0), (pad_before, pad_after)))
+        self.first_ordinal -= pad_before
+        self.n_days = self.counts.shape[1]
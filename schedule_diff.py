@@ -0,0 +1,103 @@
+"""
+Compare two versions of the schedule game by game and patch derived data.
+
+Games are matched per (home team, away team) pair: dates both versions
+agree on are unchanged, and the remaining old dates are paired in order
+with the remaining new ones as moves. A postponed game that gets a new
+date therefore shows up as one move, not as a removal plus an addition,
+and not as a chain of moves through the pair's other meetings. Whatever
+is left over on one side is a removal or an addition.
+
+    python schedule_diff.py old.csv new.csv
+    python schedule_diff.py old.csv new.csv --views default_views.json
+"""
+import argparse
+import sys
+from collections import Counter
+
+from precompute import (
+    file_version,
+    load_default_views,
+    refresh_default_views,
+    update_default_views,
+    write_json_atomic,
+)
+from schedule_data import ScheduleIndex, load_schedule
+
+
+def games_by_pair(df):
+    """{(home, away): Counter of dates}."""
+    games = {}
+    for home, away, when in zip(df["Home Team"], df["Away Team"], df["Date"]):
+        games.setdefault((home, away), Counter())[when.date()] += 1
+    return games
+
+
+def diff_schedules(old_df, new_df):
+    old_games = games_by_pair(old_df)
+    new_games = games_by_pair(new_df)
+
+    diff = {"added": [], "removed": [], "moved": []}
+    for home, away in sorted(old_games.keys() | new_games.keys()):
+        old_dates = old_games.get((home, away), Counter())
+        new_dates = new_games.get((home, away), Counter())
+        old_only = sorted((old_dates - new_dates).elements())
+        new_only = sorted((new_dates - old_dates).elements())
+        for old_date, new_date in zip(old_only, new_only):
+            diff["moved"].append({"home": home, "away": away, "old_date": old_date, "new_date": new_date})
+        for when in old_only[len(new_only):]:
+            diff["removed"].append({"home": home, "away": away, "date": when})
+        for when in new_only[len(old_only):]:
+            diff["added"].append({"home": home, "away": away, "date": when})
+    return diff
+
+
+def format_diff(diff):
+    lines = []
+    for game in diff["moved"]:
+        lines.append(f"moved    {game['away']} @ {game['home']}: {game['old_date']} -> {game['new_date']}")
+    for game in diff["added"]:
+        lines.append(f"added    {game['away']} @ {game['home']}: {game['date']}")
+    for game in diff["removed"]:
+        lines.append(f"removed  {game['away']} @ {game['home']}: {game['date']}")
+    if not lines:
+        lines.append("no changes")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report schedule changes and patch derived views.")
+    parser.add_argument("old_csv")
+    parser.add_argument("new_csv")
+    parser.add_argument("--views", help="precomputed default views built from old_csv to update in place")
+    args = parser.parse_args(argv)
+
+    old_df = load_schedule(args.old_csv)
+    diff = diff_schedules(old_df, load_schedule(args.new_csv))
+    print(format_diff(diff))
+
+    if not args.views:
+        return
+
+    table = load_default_views(args.views, file_version(args.old_csv))
+    if table is None:
+        print(f"{args.views} was not built from {args.old_csv}; rebuilding", file=sys.stderr)
+        refresh_default_views(args.new_csv, args.views, force=True)
+        return
+
+    index = ScheduleIndex(old_df)
+    try:
+        changed_days = index.apply_diff(diff)
+    except ValueError as e:
+        print(f"{e}; rebuilding {args.views}", file=sys.stderr)
+        refresh_default_views(args.new_csv, args.views, force=True)
+        return
+
+    updated = update_default_views(table, index, changed_days)
+    table["version"] = file_version(args.new_csv)
+    write_json_atomic(table, args.views)
+    print(f"updated {updated} of {len(table['views'])} precomputed days", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
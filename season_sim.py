@@ -0,0 +1,256 @@
+"""
+Monte Carlo rest-of-season simulator.
+
+Team strength is the average scoring margin in the completed games of
+"expanded schedule.csv", shrunk toward zero for teams with few games. Every
+remaining game in the schedule CSV is played out as a normal margin around
+the strength difference plus home court, for thousands of seasons at once:
+a block of simulations is one (sims x games) array, and team records come
+from cumulative sums over each team's games.
+
+Besides projected wins, each remaining second leg of a back-to-back gets
+rest odds. A team that has nothing left to play for by that date (clinched
+a top-20 finish, or can no longer reach one; roughly the play-in line in
+each conference) is assumed to rest players far more often.
+
+Simulations are split into fixed-size shards with seeds spawned from one
+root seed, so results depend only on --sims and --seed, not on how many
+worker processes ran them.
+
+    python season_sim.py --sims 100000 --workers 8
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from precompute import CSV_FILE
+from schedule_data import ScheduleIndex, load_expanded_schedule, load_schedule
+from tipoff_index import EXPANDED_CSV_FILE
+MARGIN_SD = 12.0        # spread of a single game's margin around expectation
+HOME_EDGE = 2.5         # points
+PRIOR_GAMES = 10        # strength is shrunk as if this many 0-margin games were played
+PLAYOFF_SPOTS = 20      # play-in line, both conferences together
+REST_IF_SETTLED = 0.6   # chance of resting on a second leg with nothing to play for
+REST_IF_CONTENDING = 0.1
+SHARD_SIZE = 10000
+BLOCK_SIZE = 1000       # sims per vectorized block inside a shard (bounds memory)
+
+
+# =========================
+# Model
+# =========================
+
+def _pairs(df):
+    return list(zip(df["Date"].dt.normalize(), [frozenset(p) for p in zip(df["Home Team"], df["Away Team"])]))
+
+
+class SeasonModel:
+    """Everything a worker needs, as plain arrays (cheap to ship to a process)."""
+
+    def __init__(self, schedule, expanded):
+        done = expanded.dropna(subset=["Home PTS", "Away PTS"])
+        teams = sorted(set(schedule["Home Team"]).union(schedule["Away Team"]).union(done["Home Team"]).union(done["Away Team"]))
+        self.teams = teams
+        team_pos = {team: i for i, team in enumerate(teams)}
+        n_teams = len(teams)
+
+        # Completed games: current wins and strength.
+        home = done["Home Team"].map(team_pos).to_numpy()
+        away = done["Away Team"].map(team_pos).to_numpy()
+        margin = (done["Home PTS"] - done["Away PTS"]).to_numpy(dtype=np.float64)
+        self.wins = (np.bincount(home, margin > 0, n_teams) + np.bincount(away, margin < 0, n_teams)).astype(np.int16)
+        played = np.bincount(home, minlength=n_teams) + np.bincount(away, minlength=n_teams)
+        net = np.bincount(home, margin, n_teams) - np.bincount(away, margin, n_teams)
+        self.strength = net / (played + PRIOR_GAMES)
+        # Uncertainty in that estimate, redrawn once per simulated season.
+        self.strength_sd = MARGIN_SD / np.sqrt(played + PRIOR_GAMES)
+
+        # Remaining games: in the schedule but without a score. Home/away is
+        # taken from the expanded file when it has the game; otherwise the
+        # game is treated as neutral.
+        completed = set(_pairs(done))
+        remaining = schedule[[key not in completed for key in _pairs(schedule)]]
+        orientation = {key: home for key, home in zip(_pairs(expanded), expanded["Home Team"])}
+        keys = _pairs(remaining)
+        first = remaining["Home Team"].to_numpy()
+        second = remaining["Away Team"].to_numpy()
+        known = [key in orientation for key in keys]
+        flip = np.array([orientation.get(key) == b for key, b in zip(keys, second)])
+        self.home = np.where(flip, second, first)
+        self.home = np.array([team_pos[t] for t in self.home], dtype=np.int64)
+        self.away = np.array([team_pos[t] for t in np.where(flip, first, second)], dtype=np.int64)
+        self.home_edge = np.where(known, HOME_EDGE, 0.0)
+
+        index = ScheduleIndex(schedule)
+        self.first_ordinal = index.first_ordinal
+        self.game_day = np.array([index.day_of(d) for d in remaining["Date"]], dtype=np.int64)
+
+        # Each team's remaining games in day order (CSR, like MatchupIndex).
+        tg_team = np.concatenate([self.home, self.away])
+        tg_game = np.concatenate([np.arange(len(self.home))] * 2)
+        tg_day = np.concatenate([self.game_day] * 2)
+        order = np.lexsort((tg_day, tg_team))
+        self.tg_game = tg_game[order]
+        self.tg_home = order < len(self.home)
+        self.tg_day = tg_day[order]
+        self.indptr = np.zeros(n_teams + 1, dtype=np.int64)
+        np.cumsum(np.bincount(tg_team, minlength=n_teams), out=self.indptr[1:])
+        self.max_games = int(self.wins.max() + np.diff(self.indptr).max()) if n_teams else 0
+
+        # Remaining second legs: team plays the day before and that day.
+        legs = [
+            (t, day)
+            for t in range(n_teams)
+            for day in self.tg_day[self.indptr[t]:self.indptr[t + 1]].tolist()
+            if day >= 1 and index.back_to_back[t, day - 1]
+        ]
+        self.leg_team = np.array([t for t, _ in legs], dtype=np.int64)
+        self.leg_day = np.array([d for _, d in legs], dtype=np.int64)
+        # For each leg, where every team stands entering that day: position of
+        # its first game on or after the day in the team-game arrays.
+        self.leg_pos = np.empty((len(legs), n_teams), dtype=np.int64)
+        for t in range(n_teams):
+            days = self.tg_day[self.indptr[t]:self.indptr[t + 1]]
+            self.leg_pos[:, t] = self.indptr[t] + np.searchsorted(days, self.leg_day, side="left")
+        self.leg_left = (self.indptr[1:] - self.leg_pos).astype(np.int16)
+
+    @classmethod
+    def from_csv(cls, csv_path=CSV_FILE, expanded_path=EXPANDED_CSV_FILE):
+        return cls(load_schedule(csv_path), load_expanded_schedule(expanded_path))
+
+
+# =========================
+# Simulation
+# =========================
+
+def simulate_block(model, n_sims, rng):
+    """Returns (final wins histogram [teams, max_games + 1], settled counts per leg)."""
+    n_teams = len(model.teams)
+    strength = model.strength + rng.standard_normal((n_sims, n_teams)) * model.strength_sd
+    expected = strength[:, model.home] - strength[:, model.away] + model.home_edge
+    home_won = expected + rng.standard_normal(expected.shape) * MARGIN_SD > 0
+
+    # Per team-game wins, then running totals along each team's games.
+    won = home_won[:, model.tg_game] == model.tg_home
+    running = np.zeros((n_sims, len(model.tg_game) + 1), dtype=np.int16)
+    np.cumsum(won, axis=1, dtype=np.int16, out=running[:, 1:])
+
+    final = model.wins + running[:, model.indptr[1:]] - running[:, model.indptr[:-1]]
+    histogram = np.bincount(
+        (np.arange(n_teams) * (model.max_games + 1) + final).ravel(),
+        minlength=n_teams * (model.max_games + 1),
+    ).reshape(n_teams, model.max_games + 1)
+
+    # Standings entering each second leg: (sims, legs, teams).
+    wins_now = model.wins + running[:, model.leg_pos] - running[:, None, model.indptr[:-1]]
+    ceiling = wins_now + model.leg_left
+    legs = np.arange(len(model.leg_team))
+    own_now = wins_now[:, legs, model.leg_team][..., None]
+    own_ceiling = ceiling[:, legs, model.leg_team][..., None]
+    # Clinched: fewer than PLAYOFF_SPOTS others can still catch the team.
+    # Eliminated: at least PLAYOFF_SPOTS others are already out of reach.
+    clinched = np.count_nonzero(ceiling >= own_now, axis=2) - 1 < PLAYOFF_SPOTS
+    eliminated = np.count_nonzero(wins_now > own_ceiling, axis=2) >= PLAYOFF_SPOTS
+    settled = np.count_nonzero(clinched | eliminated, axis=0)
+    return histogram, settled
+
+
+def simulate_shard(model, n_sims, seed):
+    rng = np.random.default_rng(seed)
+    histogram = np.zeros((len(model.teams), model.max_games + 1), dtype=np.int64)
+    settled = np.zeros(len(model.leg_team), dtype=np.int64)
+    for start in range(0, n_sims, BLOCK_SIZE):
+        h, s = simulate_block(model, min(BLOCK_SIZE, n_sims - start), rng)
+        histogram += h
+        settled += s
+    return histogram, settled
+
+
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _run_shard(n_sims, seed):
+    return simulate_shard(_worker_model, n_sims, seed)
+
+
+def simulate(model, n_sims, seed=0, workers=1, shard_size=SHARD_SIZE):
+    """Sum of all shards' results; identical for any number of workers."""
+    sizes = [min(shard_size, n_sims - start) for start in range(0, n_sims, shard_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers <= 1:
+        results = [simulate_shard(model, size, s) for size, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,)) as pool:
+            results = list(pool.map(_run_shard, sizes, seeds))
+    histogram = sum(h for h, _ in results)
+    settled = sum(s for _, s in results)
+    return histogram, settled
+
+
+# =========================
+# Reports
+# =========================
+
+def _percentile(histogram, q):
+    cumulative = np.cumsum(histogram, axis=1)
+    return (cumulative < q * cumulative[:, -1:]).sum(axis=1)
+
+
+def projected_wins(model, histogram):
+    n = histogram.sum(axis=1)
+    wins = np.arange(histogram.shape[1])
+    return pd.DataFrame({
+        "Team": model.teams,
+        "Wins": model.wins,
+        "Remaining": np.diff(model.indptr),
+        "Proj Wins": (histogram @ wins) / n,
+        "P10": _percentile(histogram, 0.1),
+        "P90": _percentile(histogram, 0.9),
+    })
+
+
+def rest_odds(model, settled, n_sims):
+    settled_share = settled / n_sims
+    return pd.DataFrame({
+        "Team": [model.teams[t] for t in model.leg_team],
+        "Date": [date.fromordinal(model.first_ordinal + day) for day in model.leg_day.tolist()],
+        "Settled": settled_share,
+        "Rest Odds": REST_IF_CONTENDING + (REST_IF_SETTLED - REST_IF_CONTENDING) * settled_share,
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate the rest of the season.")
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--expanded", default=EXPANDED_CSV_FILE)
+    parser.add_argument("--sims", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--legs", action="store_true", help="also list rest odds for every second leg")
+    args = parser.parse_args(argv)
+
+    model = SeasonModel.from_csv(args.csv, args.expanded)
+    histogram, settled = simulate(model, args.sims, args.seed, args.workers)
+
+    table = projected_wins(model, histogram)
+    legs = rest_odds(model, settled, args.sims)
+    per_team = legs.groupby("Team")["Rest Odds"].agg(["size", "sum"])
+    table["B2B 2nd Legs"] = table["Team"].map(per_team["size"]).fillna(0).astype(int)
+    table["Exp Rests"] = table["Team"].map(per_team["sum"]).fillna(0.0)
+    print(table.sort_values("Proj Wins", ascending=False).round(1).to_string(index=False))
+    if args.legs:
+        print()
+        print(legs.round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
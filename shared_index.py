@@ -0,0 +1,194 @@
+"""
+Compiled schedule index in one file, memory-mapped read-only by every worker.
+
+Layout (little-endian):
+
+    header   HEADER struct: magic, format, n_teams, n_days, n_games,
+             first_ordinal, schedule version, then (offset, nbytes) for
+             each section below
+    counts        int8   [n_teams, n_days]
+    cumulative    int16  [n_teams, n_days + 1]
+    back_to_back  bool   [n_teams, n_days - 1]
+    team          int16  [n_games]      (TeamGames arrays, sorted by day)
+    opponent      int16  [n_games]
+    day           int16  [n_games]
+    home          int8   [n_games]
+    teams         utf-8 team names joined by newlines
+
+Sections start on 64-byte boundaries. Arrays are numpy views straight onto
+the mapping, so N workers share one copy in the page cache. A new version
+is written to a temporary file and renamed over the old one; readers see
+the new inode on their next check and remap.
+
+    python shared_index.py publish --csv schedule_comma_separated.csv --out schedule.idx
+    python shared_index.py info schedule.idx
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+from schedule_data import ScheduleIndex, load_schedule
+from team_games import TeamGames
+
+SHARED_INDEX_FILE = os.environ.get("B2B_SHARED_INDEX", "schedule.idx")
+MAGIC = b"B2BIDX\x00\x01"
+FORMAT = 1
+SECTIONS = ["counts", "cumulative", "back_to_back", "team", "opponent", "day", "home", "teams"]
+HEADER = struct.Struct("<8sIIIIq40s" + "QQ" * len(SECTIONS))
+ALIGN = 64
+
+
+def _aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def publish_index(index, games, path, version):
+    """Write index + games to path atomically (write, fsync, rename)."""
+    payloads = {
+        "counts": np.ascontiguousarray(index.counts, dtype=np.int8),
+        "cumulative": np.ascontiguousarray(index.cumulative, dtype=np.int16),
+        "back_to_back": np.ascontiguousarray(index.back_to_back, dtype=np.bool_),
+        "team": games.team,
+        "opponent": games.opponent,
+        "day": games.day,
+        "home": games.home,
+        "teams": "\n".join(index.teams).encode("utf-8"),
+    }
+
+    table = []
+    offset = _aligned(HEADER.size)
+    for name in SECTIONS:
+        data = payloads[name]
+        nbytes = data.nbytes if isinstance(data, np.ndarray) else len(data)
+        table.extend([offset, nbytes])
+        offset = _aligned(offset + nbytes)
+
+    header = HEADER.pack(
+        MAGIC, FORMAT, len(index.teams), index.n_days, len(games.day),
+        index.first_ordinal, version.encode("ascii")[:40], *table,
+    )
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for name, section_offset in zip(SECTIONS, table[::2]):
+            f.seek(section_offset)
+            data = payloads[name]
+            f.write(data.tobytes() if isinstance(data, np.ndarray) else data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SharedIndex:
+    """Read-only view of one published file."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        fields = HEADER.unpack_from(self._map, 0)
+        magic, file_format, n_teams, n_days, n_games, first_ordinal, version = fields[:7]
+        if magic != MAGIC or file_format != FORMAT:
+            raise ValueError(f"{path} is not a format {FORMAT} shared index")
+        self.version = version.rstrip(b"\0").decode("ascii")
+        self.first_ordinal = first_ordinal
+        self.n_days = n_days
+        table = dict(zip(SECTIONS, zip(fields[7::2], fields[8::2])))
+
+        def view(name, dtype, shape):
+            offset, _ = table[name]
+            return np.frombuffer(self._map, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+
+        offset, nbytes = table["teams"]
+        self.teams = self._map[offset:offset + nbytes].decode("utf-8").split("\n")
+        self.counts = view("counts", np.int8, (n_teams, n_days))
+        self.cumulative = view("cumulative", np.int16, (n_teams, n_days + 1))
+        self.back_to_back = view("back_to_back", np.bool_, (n_teams, max(n_days - 1, 0)))
+        self.team = view("team", np.int16, (n_games,))
+        self.opponent = view("opponent", np.int16, (n_games,))
+        self.day = view("day", np.int16, (n_games,))
+        self.home = view("home", np.int8, (n_games,))
+
+    def schedule_index(self):
+        """A ScheduleIndex backed by the mapping (no copy, read-only)."""
+        index = ScheduleIndex.__new__(ScheduleIndex)
+        index.teams = self.teams
+        index.team_pos = {team: i for i, team in enumerate(self.teams)}
+        index.first_ordinal = self.first_ordinal
+        index.n_days = self.n_days
+        index.counts = self.counts
+        index.cumulative = self.cumulative
+        index.back_to_back = self.back_to_back
+        return index
+
+    def team_games(self):
+        games = TeamGames.__new__(TeamGames)
+        games.teams = self.teams
+        games.first_ordinal = self.first_ordinal
+        games.team, games.opponent, games.day, games.home = self.team, self.opponent, self.day, self.home
+        return games
+
+
+class SharedIndexReader:
+    """
+    Hands out the current SharedIndex, remapping when the file is replaced.
+    The file is stat'ed at most every check_every seconds, or right away
+    with refresh=True (after publishing from this process).
+    """
+
+    def __init__(self, path=SHARED_INDEX_FILE, check_every=5.0):
+        self.path = path
+        self.check_every = check_every
+        self._current = None
+        self._checked = 0.0
+
+    def get(self, refresh=False):
+        now = time.monotonic()
+        if refresh or self._current is None or now - self._checked >= self.check_every:
+            self._checked = now
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return self._current
+            if self._current is None or self._current.identity != (stat.st_ino, stat.st_mtime_ns):
+                # The old mapping stays valid for anyone still holding it.
+                self._current = SharedIndex(self.path)
+        return self._current
+
+
+def publish_from_csv(csv_path, path=SHARED_INDEX_FILE, version=None):
+    from precompute import file_version
+
+    df = load_schedule(csv_path)
+    index = ScheduleIndex(df)
+    publish_index(index, TeamGames.from_schedule(df, index.teams), path, version or file_version(csv_path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish or inspect the shared schedule index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish = commands.add_parser("publish")
+    publish.add_argument("--csv", default="schedule_comma_separated.csv")
+    publish.add_argument("--out", default=SHARED_INDEX_FILE)
+    info = commands.add_parser("info")
+    info.add_argument("path", nargs="?", default=SHARED_INDEX_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "publish":
+        publish_from_csv(args.csv, args.out)
+        args.path = args.out
+    shared = SharedIndex(args.path)
+    print(f"{args.path}: {len(shared.teams)} teams x {shared.n_days} days, "
+          f"{len(shared.day)} team-games, {os.path.getsize(args.path)} bytes, "
+          f"schedule {shared.version[:10]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Google Sheets inputs of the Streamer's Edge app: the schedule and the
+hand-kept ratings tab.
+
+Reads go through the shared disk cache, so every worker process on a host,
+and the startup warm-up (python warmup.py --run edge), share one fetch:
+
+    cached_schedule(DiskCache())
+"""
+import pandas as pd
+import streamlit as st
+from streamlit_gsheets import GSheetsConnection
+
+SCHEDULE_URL = "https://docs.google.com/spreadsheets/d/19WTtvYIW132Tzv94ktKNrkug_z975AfiLrbUcJq04uQ/edit?gid=1678584316#gid=1678584316"
+RATINGS_URL = "https://docs.google.com/spreadsheets/d/19WTtvYIW132Tzv94ktKNrkug_z975AfiLrbUcJq04uQ/edit?gid=1403257463#gid=1403257463"
+# Sheets data may be at most an hour old; the hour is split between the
+# app's in-process cache and the shared on-disk copy behind it.
+SHEETS_MAX_AGE = 3600
+
+
+# st.connection is cached per process, so this only builds it once.
+def sheets_connection():
+    return st.connection("gsheets", type=GSheetsConnection)
+
+
+def fetch_schedule():
+    schedule = sheets_connection().read(spreadsheet=SCHEDULE_URL)
+    schedule.columns = schedule.columns.str.strip().str.title()
+    schedule['Date'] = pd.to_datetime(schedule['Date'], dayfirst=True)
+    return schedule
+
+
+def fetch_ratings():
+    ratings = sheets_connection().read(spreadsheet=RATINGS_URL)
+    ratings.columns = ratings.columns.str.strip().str.title()
+    return ratings
+
+
+def cached_schedule(cache):
+    return cache.get_or_compute("gsheets", "schedule", fetch_schedule, max_age=SHEETS_MAX_AGE // 2)
+
+
+def cached_ratings(cache):
+    return cache.get_or_compute("gsheets", "ratings", fetch_ratings, max_age=SHEETS_MAX_AGE)
@@ -0,0 +1,102 @@
+"""
+Compact team-game storage for the API and batch paths.
+
+Every game is stored twice, once from each side, as parallel typed arrays
+sorted by day:
+
+    team      int16   index into teams
+    opponent  int16   index into teams
+    day       int16   days since first_ordinal
+    home      int8    1 if team is the home side
+
+Python objects are only created at the edges, as __slots__ views.
+"""
+from datetime import date
+
+import numpy as np
+
+from schedule_data import to_date
+
+
+class TeamGame:
+    __slots__ = ("team", "opponent", "date", "home")
+
+    def __init__(self, team, opponent, date, home):
+        self.team = team
+        self.opponent = opponent
+        self.date = date
+        self.home = home
+
+    @property
+    def matchup(self):
+        return f"vs {self.opponent}" if self.home else f"@ {self.opponent}"
+
+    def __repr__(self):
+        return f"TeamGame({self.team!r}, {self.matchup!r}, {self.date})"
+
+
+class TeamGames:
+    def __init__(self, teams, first_ordinal, team, opponent, day, home):
+        self.teams = teams
+        self.first_ordinal = first_ordinal
+        order = np.lexsort((team, day))
+        self.team = np.ascontiguousarray(team[order], dtype=np.int16)
+        self.opponent = np.ascontiguousarray(opponent[order], dtype=np.int16)
+        self.day = np.ascontiguousarray(day[order], dtype=np.int16)
+        self.home = np.ascontiguousarray(home[order], dtype=np.int8)
+
+    @classmethod
+    def from_schedule(cls, df, teams=None):
+        if teams is None:
+            teams = sorted(set(df["Home Team"]).union(df["Away Team"]))
+        team_pos = {team: i for i, team in enumerate(teams)}
+
+        first_day = df["Date"].min()
+        day = (df["Date"] - first_day).dt.days.to_numpy()
+        home = df["Home Team"].map(team_pos).to_numpy()
+        away = df["Away Team"].map(team_pos).to_numpy()
+        n = len(df)
+
+        return cls(
+            teams,
+            first_day.date().toordinal(),
+            team=np.concatenate([home, away]),
+            opponent=np.concatenate([away, home]),
+            day=np.concatenate([day, day]),
+            home=np.concatenate([np.ones(n, dtype=np.int8), np.zeros(n, dtype=np.int8)]),
+        )
+
+    def __len__(self):
+        return len(self.day)
+
+    @property
+    def nbytes(self):
+        return self.team.nbytes + self.opponent.nbytes + self.day.nbytes + self.home.nbytes
+
+    def day_of(self, value):
+        return to_date(value).toordinal() - self.first_ordinal
+
+    def window(self, start_date, end_date):
+        """Slice of positions for games between two dates, inclusive."""
+        lo = np.searchsorted(self.day, self.day_of(start_date), side="left")
+        hi = np.searchsorted(self.day, self.day_of(end_date), side="right")
+        return slice(lo, hi)
+
+    def games_per_team(self, start_date, end_date):
+        """Games per team (in self.teams order) in the window."""
+        return np.bincount(self.team[self.window(start_date, end_date)], minlength=len(self.teams))
+
+    def view(self, i):
+        return TeamGame(
+            self.teams[self.team[i]],
+            self.teams[self.opponent[i]],
+            date.fromordinal(self.first_ordinal + int(self.day[i])),
+            bool(self.home[i]),
+        )
+
+    def views(self, start_date, end_date, team=None):
+        """TeamGame views for the window, optionally for one team only."""
+        positions = np.arange(len(self))[self.window(start_date, end_date)]
+        if team is not None:
+            positions = positions[self.team[positions] == self.teams.index(team)]
+        return [self.view(i) for i in positions]
@@ -0,0 +1,204 @@
+"""
+Tip-off aware schedule index for users outside US Eastern time.
+
+"expanded schedule.csv" gives each game's date and start time in ET. Every
+tip-off is parsed once into a tz-aware timestamp. The first time a zone is
+asked for, each game's local calendar day there is computed and turned into
+a ScheduleIndex, so "today/tomorrow" and window queries in that zone are
+the same array lookups as the ET ones.
+
+    tipoffs = TipoffIndex.from_csv()
+    tipoffs.get_back_to_back_teams(tipoffs.today("Europe/London"), "Europe/London")
+
+Start times are also bucketed into slates (by ET tip-off, the way daily
+lineup sites split a night). A SlateIndex holds one team x day count matrix
+per slate with running totals, so a slate-filtered window count is the same
+subtraction as an unfiltered one:
+
+    tipoffs.games_per_team_in_range("2025-12-15", "2025-12-21", slates=["late"])
+
+Overlapping tip-offs: each game counts as in progress for GAME_MINUTES
+after it tips, and overlaps() lists every tip-off time in a window with how
+many games are running at that moment, from one sorted array of tip-off
+minutes and two binary searches per game.
+
+    tipoffs.overlaps("2025-12-15", "2025-12-21", "Europe/London")
+"""
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from schedule_data import ScheduleIndex, load_expanded_schedule, rank_totals
+
+EXPANDED_CSV_FILE = "expanded schedule.csv"
+SCHEDULE_TZ = "America/New_York"
+# Built up front by precompute(); any other zone is built on first use.
+COMMON_ZONES = [
+    "America/New_York", "America/Chicago", "America/Denver", "America/Los_Angeles",
+    "UTC", "Europe/London", "Europe/Paris", "Asia/Kolkata", "Asia/Tokyo", "Australia/Sydney",
+]
+# (name, first ET tip-off in the slate); a slate runs until the next one starts.
+DEFAULT_SLATES = [("day", "12:00a"), ("early", "7:00p"), ("late", "9:00p")]
+GAME_MINUTES = 150      # tip-off to final buzzer, roughly
+
+
+def valid_zone(tz_name, default=SCHEDULE_TZ):
+    """tz_name if it's a zone ZoneInfo knows (e.g. from the browser), else default."""
+    try:
+        ZoneInfo(tz_name)
+    except Exception:
+        return default
+    return tz_name
+
+
+def local_today(tz_name):
+    return datetime.now(ZoneInfo(tz_name)).date()
+
+
+def parse_start_minutes(start):
+    """'7:30p' -> 1170 (minutes after midnight)."""
+    clock, half = start[:-1], start[-1].lower()
+    hours, minutes = (int(part) for part in clock.split(":"))
+    if half == "p" and hours != 12:
+        hours += 12
+    elif half == "a" and hours == 12:
+        hours = 0
+    return hours * 60 + minutes
+
+
+class TipoffIndex:
+    def __init__(self, df):
+        """df columns: Date (naive ET day), Start (ET), Home Team, Away Team."""
+        self.home = df["Home Team"].to_numpy()
+        self.away = df["Away Team"].to_numpy()
+
+        self.start_minutes = np.array([parse_start_minutes(s) for s in df["Start (ET)"]], dtype=np.int16)
+        start = pd.to_timedelta(self.start_minutes, unit="m")
+        self.tipoffs = (df["Date"] + start).dt.tz_localize(SCHEDULE_TZ)
+        # Absolute minutes, so games that run past midnight still overlap
+        # with the next day's early tip-offs in any zone.
+        self.tip_minutes = ((self.tipoffs - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(minutes=1)).to_numpy(np.int64)
+        self._sorted_minutes = np.sort(self.tip_minutes)
+        self._by_zone = {}
+        self._slates = {}
+
+    @classmethod
+    def from_csv(cls, csv_path=EXPANDED_CSV_FILE):
+        return cls(load_expanded_schedule(csv_path))
+
+    def local_days(self, tz_name):
+        """Calendar day of every game's tip-off in tz_name."""
+        return self.for_zone(tz_name)[1]
+
+    def for_zone(self, tz_name):
+        if tz_name not in self._by_zone:
+            days = self.tipoffs.dt.tz_convert(tz_name).dt.tz_localize(None).dt.normalize()
+            df = pd.DataFrame({"Date": days, "Home Team": self.home, "Away Team": self.away})
+            self._by_zone[tz_name] = (ScheduleIndex(df), days)
+        return self._by_zone[tz_name]
+
+    def precompute(self, zones=COMMON_ZONES):
+        for tz_name in zones:
+            self.slate_index(tz_name)
+        return self
+
+    def index(self, tz_name=SCHEDULE_TZ):
+        return self.for_zone(tz_name)[0]
+
+    def today(self, tz_name):
+        return local_today(tz_name)
+
+    def get_back_to_back_teams(self, base_date, tz_name=SCHEDULE_TZ):
+        return self.index(tz_name).get_back_to_back_teams(base_date)
+
+    def concurrent_games(self, game_minutes=GAME_MINUTES):
+        """Games in progress at each game's tip-off, itself included."""
+        running = np.searchsorted(self._sorted_minutes, self.tip_minutes, side="right")
+        started = np.searchsorted(self._sorted_minutes, self.tip_minutes - game_minutes, side="right")
+        return running - started
+
+    def overlaps(self, start_date, end_date, tz_name=SCHEDULE_TZ, game_minutes=GAME_MINUTES):
+        """
+        Date / Tip-off (local) / Games / Concurrent / Matchups, one row per
+        tip-off time in the window. Concurrent counts the games tipping then
+        plus earlier ones still running.
+        """
+        days = self.local_days(tz_name)
+        inside = ((days >= pd.Timestamp(start_date)) & (days <= pd.Timestamp(end_date))).to_numpy()
+        local = self.tipoffs[inside].dt.tz_convert(tz_name)
+        games = pd.DataFrame({
+            "Date": days[inside].dt.date,
+            "Tip-off": local.dt.strftime("%H:%M"),
+            "Concurrent": self.concurrent_games(game_minutes)[inside],
+            "Matchups": [f"{away} @ {home}" for away, home in zip(self.away[inside], self.home[inside])],
+        })
+        table = games.groupby(["Date", "Tip-off"], sort=True).agg(
+            Games=("Matchups", "size"),
+            Concurrent=("Concurrent", "max"),
+            Matchups=("Matchups", " | ".join),
+        )
+        return table.reset_index()
+
+    def slate_index(self, tz_name=SCHEDULE_TZ, slates=DEFAULT_SLATES):
+        key = (tz_name, tuple(slates))
+        if key not in self._slates:
+            index, days = self.for_zone(tz_name)
+            self._slates[key] = SlateIndex(index, days, self.start_minutes, self.home, self.away, slates)
+        return self._slates[key]
+
+    def games_per_team_in_range(self, start_date, end_date, tz_name=SCHEDULE_TZ, slates=None):
+        """Games per team in the window; slates (names) limits it to those tip-off slates."""
+        if slates is None:
+            return self.index(tz_name).games_per_team_in_range(start_date, end_date)
+        return self.slate_index(tz_name).games_per_team_in_range(start_date, end_date, slates)
+
+
+class SlateIndex:
+    """
+    counts[s, t, d]: games team t tips off in slate s on day d, laid out like
+    ScheduleIndex.counts (same teams and days), with running totals along d.
+    """
+
+    def __init__(self, index, days, start_minutes, home, away, slates=DEFAULT_SLATES):
+        self.index = index
+        self.names = [name for name, _ in slates]
+        self.bounds = np.array([parse_start_minutes(start) for _, start in slates], dtype=np.int16)
+        if len(self.bounds) == 0 or (np.diff(self.bounds) <= 0).any():
+            raise ValueError(f"slates must start at increasing times: {slates}")
+
+        # Tip-offs before the first slate's start belong to the first slate.
+        self.slate = np.maximum(np.searchsorted(self.bounds, start_minutes, side="right") - 1, 0)
+        day = np.array([index.day_of(d) for d in days], dtype=np.int64)
+        home = np.array([index.team_pos[t] for t in home], dtype=np.int64)
+        away = np.array([index.team_pos[t] for t in away], dtype=np.int64)
+
+        counts = np.zeros((len(self.names), len(index.teams), index.n_days), dtype=np.int8)
+        np.add.at(counts, (self.slate, home, day), 1)
+        np.add.at(counts, (self.slate, away, day), 1)
+        self.counts = counts
+        self.cumulative = np.zeros(counts.shape[:2] + (index.n_days + 1,), dtype=np.int16)
+        np.cumsum(counts, axis=2, out=self.cumulative[:, :, 1:])
+
+    def slate_positions(self, slates):
+        unknown = [name for name in slates if name not in self.names]
+        if unknown:
+            raise ValueError(f"unknown slates {unknown}; have {self.names}")
+        return [self.names.index(name) for name in slates]
+
+    def window_totals(self, start_date, end_date, slates=None):
+        """Games per team (index.teams order) in the given slates between two dates, inclusive."""
+        selected = self.slate_positions(slates) if slates is not None else list(range(len(self.names)))
+        start, end = self.index.window_bounds(start_date, end_date)
+        if start > end or not selected:
+            return np.zeros(len(self.index.teams), dtype=np.int16)
+        cumulative = self.cumulative[selected]
+        return (cumulative[:, :, end + 1] - cumulative[:, :, start]).sum(axis=0, dtype=np.int16)
+
+    def ranked_games(self, start_date, end_date, slates=None):
+        """Dict of team -> games, most first (ties by name), like ScheduleIndex.ranked_games."""
+        return rank_totals(self.index.teams, self.window_totals(start_date, end_date, slates))
+
+    def games_per_team_in_range(self, start_date, end_date, slates=None):
+        return pd.Series(self.ranked_games(start_date, end_date, slates), dtype=int)
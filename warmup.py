@@ -0,0 +1,206 @@
+"""
+Background warm-up: run a list of cache-filling tasks at process start and
+then on a timer, so the first user after a deploy doesn't pay for them.
+
+    warmup = Warmup([("schedule index", build_index), ...]).start()
+    warmup.ready.is_set()        # True once every task has run once
+
+The files every worker shares (schedule.idx, default_views.json, the
+popular heatmaps and the Sheets copy in the disk cache) are built by a
+startup step run before the server, not by the first browser session:
+
+    python warmup.py --run app3 && streamlit run nba_fantasy_app3.py
+    python warmup.py --run edge && streamlit run nba_fantasy_app-need_spacing_fix.py
+
+Readiness files are per app (written by --run) and per process (written by
+an app's own Warmup after its first pass), so neither another app nor a
+new worker can clear one it didn't write. A process removes its own file
+when it exits, so they don't pile up across restarts. A container health
+check waits on the app's file:
+
+    python warmup.py --wait 120 --app app3    # exit 0 once ready, 1 on timeout
+"""
+import argparse
+import atexit
+import logging
+import os
+import sys
+import threading
+import time
+
+READY_FILE = os.environ.get("B2B_READY_FILE", ".warmup_ready")
+DEFAULT_INTERVAL = 30 * 60
+
+log = logging.getLogger(__name__)
+
+
+def ready_path(app, pid=None):
+    """.warmup_ready.<app> for the startup step, .warmup_ready.<app>.<pid> for one process."""
+    path = f"{READY_FILE}.{app}"
+    return path if pid is None else f"{path}.{pid}"
+
+
+def clear_ready_file(path):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class Warmup:
+    def __init__(self, tasks, interval=DEFAULT_INTERVAL, ready_file=None):
+        self.tasks = tasks
+        self.interval = interval
+        self.ready_file = ready_file
+        self.ready = threading.Event()
+        self.status = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            # A file left by an earlier process with this pid says nothing
+            # about this one.
+            clear_ready_file(self.ready_file)
+            # ...and nothing should outlive this one to be picked up by
+            # the next process handed the same pid.
+            atexit.register(self.stop)
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            clear_ready_file(self.ready_file)
+
+    def run_once(self):
+        for name, task in self.tasks:
+            started = time.perf_counter()
+            try:
+                task()
+                error = None
+            except Exception as e:
+                # A failed task shouldn't keep the app from serving; it'll
+                # simply compute on demand.
+                log.exception("warm-up task %r failed", name)
+                error = f"{type(e).__name__}: {e}"
+            with self._lock:
+                self.status[name] = {
+                    "seconds": time.perf_counter() - started,
+                    "error": error,
+                    "finished": time.time(),
+                }
+
+        if not self.ready.is_set():
+            with self._lock:
+                # Under the lock so a concurrent stop() can't remove the
+                # file before it is written.
+                if self.ready_file and not self._stop.is_set():
+                    with open(self.ready_file, "w") as f:
+                        f.write(f"{os.getpid()} {time.time()}\n")
+            self.ready.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+    def summary(self):
+        with self._lock:
+            return dict(self.status)
+
+
+# =========================
+# Startup (run before the app server)
+# =========================
+
+def app3_startup_tasks():
+    from datetime import datetime
+    from zoneinfo import ZoneInfo
+
+    from disk_cache import DiskCache
+    from heatmap import heatmap_cache_key, heatmap_spec, popular_windows
+    from precompute import CSV_FILE, VIEWS_FILE, file_version, refresh_default_views
+    from shared_index import SHARED_INDEX_FILE, SharedIndexReader, publish_from_csv
+    from tipoff_index import SCHEDULE_TZ
+
+    version = file_version(CSV_FILE)
+    reader = SharedIndexReader(SHARED_INDEX_FILE)
+
+    def shared_index():
+        shared = reader.get()
+        if shared is None or shared.version != version:
+            publish_from_csv(CSV_FILE, SHARED_INDEX_FILE, version)
+
+    def popular_heatmaps():
+        # Same keys as the app's load_heatmap_spec, so its first request is a hit.
+        index = reader.get(refresh=True).schedule_index()
+        cache = DiskCache()
+        for start, end in popular_windows(datetime.now(ZoneInfo(SCHEDULE_TZ)).date()):
+            cache.get_or_compute(version, heatmap_cache_key(SCHEDULE_TZ, start, end),
+                                 lambda: heatmap_spec(index, start, end))
+
+    return [
+        ("shared index", shared_index),
+        ("default views", lambda: refresh_default_views(CSV_FILE, VIEWS_FILE)),
+        ("popular heatmaps", popular_heatmaps),
+    ]
+
+
+def edge_startup_tasks():
+    from disk_cache import DiskCache
+    from sheets import cached_schedule
+
+    return [("sheets", lambda: cached_schedule(DiskCache()))]
+
+
+STARTUP_TASKS = {"app3": app3_startup_tasks, "edge": edge_startup_tasks}
+
+
+def run_startup(app):
+    """Build the app's shared files once, then write its readiness file."""
+    ready_file = ready_path(app)
+    clear_ready_file(ready_file)
+    warmup = Warmup(STARTUP_TASKS[app](), ready_file=ready_file)
+    warmup.run_once()
+    return warmup.summary()
+
+
+def wait_for_ready_file(path=READY_FILE, timeout=120, poll=0.5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(path):
+            return True
+        time.sleep(poll)
+    return os.path.exists(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Startup warm-up and health check.")
+    parser.add_argument("--run", choices=sorted(STARTUP_TASKS), help="build this app's shared files, then exit")
+    parser.add_argument("--wait", type=float, default=0, help="seconds to wait for readiness")
+    parser.add_argument("--app", choices=sorted(STARTUP_TASKS), help="check this app's startup readiness file")
+    parser.add_argument("--ready-file", help="check this file instead (e.g. one process's)")
+    args = parser.parse_args(argv)
+
+    if args.run:
+        logging.basicConfig(level=logging.INFO)
+        summary = run_startup(args.run)
+        for name, status in summary.items():
+            outcome = status["error"] or "ok"
+            print(f"{name:20s} {status['seconds'] * 1000:8.1f} ms  {outcome}")
+        # A failed task only means the app computes it on demand.
+        return
+
+    if args.ready_file is None and args.app is None:
+        parser.error("--wait needs --app or --ready-file")
+    ready = wait_for_ready_file(args.ready_file or ready_path(args.app), args.wait)
+    print("ready" if ready else "warming up")
+    sys.exit(0 if ready else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Watchlist alerts for many users at once.
+
+Each rule watches a set of teams, stored as one bitmask (bit t = team t in
+index order):
+
+    {"user": "sam", "rule": "my-b2bs", "type": "b2b", "teams": ["Boston Celtics", ...]}
+    {"user": "sam", "rule": "busy-week", "type": "games", "min_games": 4}
+
+"b2b" fires when a watched team starts a run of min_streak (default 2)
+consecutive game days within the next `days` days (default 2: today or
+tomorrow). "games" fires when a watched team plays min_games or more in the
+next calendar week. Leaving out "teams" watches every team.
+
+The schedule side is a handful of bitmasks per day (teams playing, teams
+starting a streak of k days) and one mask per game-count threshold for
+next week. Evaluating every rule is then an AND between the rule masks and
+those, in one pass over a (rules x days) array; only non-zero results are
+unpacked into alerts.
+
+Alerts go to a sqlite outbox keyed by (user, rule, team, date). Re-running
+on the same day, or from several worker processes, adds nothing new, so a
+delivery job only ever sees each alert once.
+
+    python watchlist.py --rules watchlists.json --date 2025-12-15
+    python watchlist.py --pending
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from precompute import CSV_FILE
+from schedule_data import ScheduleIndex, load_schedule, to_date
+WATCHLIST_FILE = os.environ.get("B2B_WATCHLIST_PATH", "watchlists.json")
+OUTBOX_FILE = os.environ.get("B2B_OUTBOX_PATH", "alerts.sqlite")
+B2B_DAYS = 2
+MAX_TEAMS = 64
+
+
+def team_bits(n_teams):
+    if n_teams > MAX_TEAMS:
+        raise ValueError(f"team bitmasks hold at most {MAX_TEAMS} teams, got {n_teams}")
+    return np.left_shift(np.uint64(1), np.arange(n_teams, dtype=np.uint64))
+
+
+def pack(matrix, bits):
+    """bool [..., teams] -> uint64 [...] with bit t set where matrix[..., t]."""
+    return np.bitwise_or.reduce(np.where(matrix, bits, np.uint64(0)), axis=-1)
+
+
+def unpack(mask, teams):
+    mask = int(mask)
+    return [team for t, team in enumerate(teams) if mask >> t & 1]
+
+
+# =========================
+# Schedule masks
+# =========================
+
+class ScheduleMasks:
+    def __init__(self, index):
+        self.index = index
+        self.teams = index.teams
+        self.bits = team_bits(len(self.teams))
+        plays = index.counts > 0
+        self.playing = pack(plays.T, self.bits)
+
+        # streak[t, d]: consecutive game days for team t starting at day d.
+        streak = np.zeros((len(self.teams), index.n_days + 1), dtype=np.int16)
+        for day in range(index.n_days - 1, -1, -1):
+            streak[:, day] = np.where(plays[:, day], streak[:, day + 1] + 1, 0)
+        self.streak = streak[:, :-1]
+        # Only the first day of a run counts as its start.
+        self._run_start = plays & ~np.concatenate([np.zeros((len(self.teams), 1), bool), plays[:, :-1]], axis=1)
+        self._streak_masks = {}
+
+    def streak_masks(self, length):
+        """uint64 per day: teams starting a run of at least `length` game days."""
+        if length not in self._streak_masks:
+            self._streak_masks[length] = pack((self._run_start & (self.streak >= length)).T, self.bits)
+        return self._streak_masks[length]
+
+    def game_count_masks(self, start_date, end_date, thresholds):
+        """uint64 per threshold: teams with at least that many games in the window."""
+        totals = self.index.window_totals(start_date, end_date)
+        return pack(totals[None, :] >= np.asarray(thresholds)[:, None], self.bits)
+
+
+# =========================
+# Rules
+# =========================
+
+class RuleSet:
+    """All users' rules as parallel arrays."""
+
+    def __init__(self, rules, teams):
+        team_pos = {team: i for i, team in enumerate(teams)}
+        bits = team_bits(len(teams))
+        everyone = np.bitwise_or.reduce(bits) if len(bits) else np.uint64(0)
+
+        self.rules = list(rules)
+        self.masks = np.empty(len(self.rules), dtype=np.uint64)
+        for r, rule in enumerate(self.rules):
+            if rule["type"] not in ("b2b", "games"):
+                raise ValueError(f"rule {rule['user']}/{rule['rule']}: unknown type {rule['type']!r}")
+            watched = rule.get("teams")
+            if watched is None:
+                self.masks[r] = everyone
+                continue
+            unknown = [team for team in watched if team not in team_pos]
+            if unknown:
+                raise ValueError(f"rule {rule['user']}/{rule['rule']}: unknown teams {unknown}")
+            self.masks[r] = sum(1 << team_pos[team] for team in set(watched))
+
+        kinds = np.array([rule["type"] for rule in self.rules])
+        self.b2b = np.flatnonzero(kinds == "b2b")
+        self.streaks = np.array([self.rules[r].get("min_streak", 2) for r in self.b2b], dtype=np.int64)
+        self.days = np.array([self.rules[r].get("days", B2B_DAYS) for r in self.b2b], dtype=np.int64)
+        self.games = np.flatnonzero(kinds == "games")
+        self.thresholds = np.array([self.rules[r].get("min_games", 4) for r in self.games], dtype=np.int64)
+
+    @classmethod
+    def from_file(cls, path, teams):
+        with open(path) as f:
+            return cls(json.load(f), teams)
+
+    def __len__(self):
+        return len(self.rules)
+
+
+def next_week(today):
+    monday = today + timedelta(days=7 - today.weekday())
+    return monday, monday + timedelta(days=6)
+
+
+def evaluate(masks, rules, today):
+    """Every (user, rule, type, team, date, message) that matches as of today."""
+    today = to_date(today)
+    index = masks.index
+    alerts = []
+    # Many rules share the same few hit masks; unpack each once.
+    team_lists = {}
+
+    def teams_in(mask):
+        mask = int(mask)
+        if mask not in team_lists:
+            team_lists[mask] = unpack(mask, masks.teams)
+        return team_lists[mask]
+
+    if len(rules.b2b):
+        # (b2b rules x lookahead days) of hits, one AND per cell.
+        lookahead = int(rules.days.max())
+        day = index.day_of(today) + np.arange(lookahead)
+        valid = (day >= 0) & (day < index.n_days)
+        starts = np.zeros((len(rules.b2b), lookahead), dtype=np.uint64)
+        for length in np.unique(rules.streaks).tolist():
+            rows = rules.streaks == length
+            starts[rows] = np.where(valid, masks.streak_masks(length)[np.clip(day, 0, index.n_days - 1)], 0)
+        within = np.arange(lookahead)[None, :] < rules.days[:, None]
+        hits = np.where(within, rules.masks[rules.b2b][:, None] & starts, np.uint64(0))
+        for r, offset in zip(*np.nonzero(hits)):
+            rule = rules.rules[rules.b2b[r]]
+            when = today + timedelta(days=int(offset))
+            for team in teams_in(hits[r, offset]):
+                what = "back-to-back" if rules.streaks[r] == 2 else f"{rules.streaks[r]} days in a row"
+                alerts.append((rule["user"], rule["rule"], "b2b", team, when,
+                               f"{team} play a {what} starting {when:%a %b %d}"))
+
+    if len(rules.games):
+        monday, sunday = next_week(today)
+        thresholds, which = np.unique(rules.thresholds, return_inverse=True)
+        hits = rules.masks[rules.games] & masks.game_count_masks(monday, sunday, thresholds)[which]
+        totals = index.window_totals(monday, sunday)
+        for r in np.flatnonzero(hits):
+            rule = rules.rules[rules.games[r]]
+            for team in teams_in(hits[r]):
+                alerts.append((rule["user"], rule["rule"], "games", team, monday,
+                               f"{team} play {totals[index.team_pos[team]]} games the week of {monday:%b %d}"))
+
+    return alerts
+
+
+# =========================
+# Outbox
+# =========================
+
+class Outbox:
+    def __init__(self, path=OUTBOX_FILE):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS alerts (
+                    id         INTEGER PRIMARY KEY,
+                    user       TEXT NOT NULL,
+                    rule       TEXT NOT NULL,
+                    type       TEXT NOT NULL,
+                    team       TEXT NOT NULL,
+                    event_date TEXT NOT NULL,
+                    message    TEXT NOT NULL,
+                    created    REAL NOT NULL,
+                    delivered  REAL,
+                    UNIQUE (user, rule, team, event_date)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS alerts_pending ON alerts (delivered)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, alerts):
+        """Insert alerts not already in the outbox; returns how many were new."""
+        conn = self._connect()
+        now = time.time()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO alerts (user, rule, type, team, event_date, message, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(user, rule, kind, team, when.isoformat(), message, now)
+                 for user, rule, kind, team, when, message in alerts],
+            )
+            return conn.total_changes - before
+
+    def pending(self, limit=None):
+        rows = self._connect().execute(
+            "SELECT id, user, rule, team, event_date, message FROM alerts "
+            "WHERE delivered IS NULL ORDER BY id LIMIT ?",
+            (-1 if limit is None else limit,),
+        )
+        return rows.fetchall()
+
+    def mark_delivered(self, ids):
+        conn = self._connect()
+        with conn:
+            conn.executemany("UPDATE alerts SET delivered = ? WHERE id = ?", [(time.time(), i) for i in ids])
+
+
+class AlertRunner:
+    """Re-evaluates only when the schedule version or the date has changed."""
+
+    def __init__(self, rules_path=WATCHLIST_FILE, outbox=None):
+        self.rules_path = rules_path
+        self.outbox = outbox or Outbox()
+        self._last = None
+        self._masks = None
+
+    def run(self, index, version, today):
+        rules_stamp = os.stat(self.rules_path).st_mtime_ns
+        key = (version, rules_stamp, to_date(today))
+        if key == self._last:
+            return 0
+        if self._masks is None or self._masks.index is not index:
+            self._masks = ScheduleMasks(index)
+        rules = RuleSet.from_file(self.rules_path, index.teams)
+        added = self.outbox.add(evaluate(self._masks, rules, today))
+        self._last = key
+        return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate watchlist rules into the alert outbox.")
+    parser.add_argument("--csv", default=CSV_FILE)
+    parser.add_argument("--rules", default=WATCHLIST_FILE)
+    parser.add_argument("--outbox", default=OUTBOX_FILE)
+    parser.add_argument("--date", help="YYYY-MM-DD to evaluate as today (default: today)")
+    parser.add_argument("--pending", action="store_true", help="list undelivered alerts instead")
+    args = parser.parse_args(argv)
+
+    outbox = Outbox(args.outbox)
+    if args.pending:
+        for row in outbox.pending():
+            print(*row, sep="\t")
+        return
+
+    index = ScheduleIndex(load_schedule(args.csv))
+    today = to_date(args.date) if args.date else date.today()
+    masks = ScheduleMasks(index)
+    rules = RuleSet.from_file(args.rules, index.teams)
+
+    started = time.perf_counter()
+    alerts = evaluate(masks, rules, today)
+    elapsed = time.perf_counter() - started
+    added = outbox.add(alerts)
+    print(f"{len(rules)} rules, {len(alerts)} matches, {added} new in {args.outbox} "
+          f"(evaluated in {elapsed * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()